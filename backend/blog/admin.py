@@ -14,11 +14,10 @@ from django.utils import timezone
 from django.views.decorators.http import require_http_methods, require_POST, require_GET
 from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
-from django.core import signing
 from django.contrib.auth import get_user_model
 from django.db.models.functions import TruncDate
 from django.db.models import Count
-from django.db import models
+from django.db import models, transaction
 from django.utils.safestring import mark_safe
 from django.utils.html import escape
 from django.utils.module_loading import import_string
@@ -30,7 +29,9 @@ except Exception:
     # fallback to import error, but code will continue — missing widget will raise later if used
     MediaLibraryWidget = None
 
-from .utils import translit_slugify
+from .patching import PatchError, VersionConflict, check_base_version, post_version, resolve_patch, wants_patch
+from .previews import store_preview
+from .utils import allocate_slug
 
 logger = logging.getLogger(__name__)
 
@@ -60,7 +61,6 @@ except Exception:
     ProjectPostAdminForm = None
 
 CustomUser = get_user_model()
-PREVIEW_SALT = "post-preview-salt"
 
 # -----------------------
 # TipTap Widget (robust fallback)
@@ -233,17 +233,7 @@ class BasePostAdmin(VersionAdmin):
     )
 
     def save_model(self, request, obj, form, change):
-        # slug generation
-        if not getattr(obj, "slug", None):
-            base = translit_slugify(getattr(obj, "title", "") or "")
-            if not base:
-                base = translit_slugify(getattr(obj, "meta_title", "") or getattr(obj, "excerpt", "") or "post")
-            slug = base
-            i = 1
-            while self.model.objects.filter(slug=slug).exclude(pk=getattr(obj, 'pk', None)).exists():
-                i += 1
-                slug = f"{base}-{i}"
-            obj.slug = slug
+        # empty slug is allocated on save by SlugAllocationMixin (blog.utils.allocate_slug)
 
         # ensure published_at
         if getattr(obj, 'status', None) == 'published' and not getattr(obj, 'published_at', None):
@@ -290,13 +280,24 @@ class BasePostAdmin(VersionAdmin):
             from django.forms import modelform_factory
             return modelform_factory(self.model, fields="__all__")
 
+    def _set_status(self, queryset, status):
+        # save() per post rather than update(): the post_save receivers keep the API/feed caches,
+        # related and archive indexes, next-publish time and edge keys current, and updated_at
+        # moves so incremental exports see the change
+        updated = 0
+        for post in queryset.exclude(status=status):
+            post.status = status
+            post.save(update_fields=["status", "updated_at"])
+            updated += 1
+        return updated
+
     def make_published(self, request, queryset):
-        updated = queryset.update(status="published")
+        updated = self._set_status(queryset, "published")
         self.message_user(request, f"{updated} постов опубликовано.")
     make_published.short_description = "Опубликовать выбранные"
 
     def make_draft(self, request, queryset):
-        updated = queryset.update(status="draft")
+        updated = self._set_status(queryset, "draft")
         self.message_user(request, f"{updated} постов переведено в черновики.")
     make_draft.short_description = "Перевести в черновики"
 
@@ -305,9 +306,14 @@ class BasePostAdmin(VersionAdmin):
         for p in queryset:
             old_slug = getattr(p, "slug", "") or ""
             p.pk = None
-            p.slug = f"{old_slug}-copy"
+            p.slug = allocate_slug(Post, f"{old_slug}-copy", fallback="post")
             p.title = f"{getattr(p, 'title', '')} (копия)"
             p.status = "draft"
+            # the copy has no comments, likes or views of its own yet
+            p.comments_count = p.likes_count = p.views_count = 0
+            # the cover attachment belongs to the original; the copy gets its own OG card
+            p.cover_attachment = None
+            p.og_image, p.og_image_hash = "", ""
             p.save()
             created += 1
         self.message_user(request, f"Создано {created} копий.")
@@ -317,23 +323,25 @@ class BasePostAdmin(VersionAdmin):
 class CategoryAdmin(admin.ModelAdmin):
     list_display = ("title", "slug", "post_count")
     prepopulated_fields = {"slug": ("title",)}
+    def get_queryset(self, request):
+        # one COUNT per changelist instead of one per row
+        return super().get_queryset(request).annotate(_post_count=Count("posts", distinct=True))
     def post_count(self, obj):
-        try:
-            return obj.posts.count()
-        except Exception:
-            return 0
+        return getattr(obj, "_post_count", 0)
     post_count.short_description = "Постов"
+    post_count.admin_order_field = "_post_count"
 
 
 class TagAdmin(admin.ModelAdmin):
     list_display = ("title", "slug", "post_count")
     prepopulated_fields = {"slug": ("title",)}
+    def get_queryset(self, request):
+        # one COUNT per changelist instead of one per row
+        return super().get_queryset(request).annotate(_post_count=Count("posts", distinct=True))
     def post_count(self, obj):
-        try:
-            return obj.posts.count()
-        except Exception:
-            return 0
+        return getattr(obj, "_post_count", 0)
     post_count.short_description = "Постов"
+    post_count.admin_order_field = "_post_count"
 
 
 class CommentAdmin(admin.ModelAdmin):
@@ -699,8 +707,7 @@ def admin_preview_token_view(request):
             'generated_by': request.user.pk,
             'generated_at': timezone.now().isoformat(),
         }
-        token = signing.dumps(package, salt=PREVIEW_SALT)
-        return JsonResponse({'token': token})
+        return JsonResponse({'token': store_preview(package)})
     except Exception:
         logger.exception("Preview token failed")
         return JsonResponse({'detail': 'error'}, status=500)
@@ -715,39 +722,58 @@ def admin_autosave_view(request):
     except Exception:
         return JsonResponse({'success': False, 'message': 'Invalid JSON'}, status=400)
 
-    post_id = payload.get('id')
-    if post_id:
-        post = Post.objects.filter(pk=post_id).first() if Post is not None else None
-        if not post and Post is not None:
-            post = Post(author=request.user, status='draft')
-    else:
-        post = Post(author=request.user, status='draft') if Post is not None else None
-
-    if post is None:
-        return JsonResponse({'success': False, 'message': 'Post model not available'}, status=500)
-
-    for f in ('title', 'excerpt', 'content', 'featured_image'):
-        if f in payload:
-            setattr(post, f, payload[f])
-    if payload.get('published_at'):
-        from django.utils.dateparse import parse_datetime, parse_date
-        dt = parse_datetime(payload['published_at']) or parse_date(payload['published_at'])
-        if dt:
-            post.published_at = dt
+    # version check and save in one transaction, the row locked in between
+    with transaction.atomic():
+        post_id = payload.get('id')
+        if post_id:
+            post = Post.objects.select_for_update().filter(pk=post_id).first() if Post is not None else None
+            if not post and Post is not None:
+                post = Post(author=request.user, status='draft')
+        else:
+            post = Post(author=request.user, status='draft') if Post is not None else None
 
-    try:
-        post.save()
+        if post is None:
+            return JsonResponse({'success': False, 'message': 'Post model not available'}, status=500)
+
+        if post.pk and wants_patch(payload):
+            # content_patch / content_json_patch / base_version instead of the whole body (blog/patching.py)
+            try:
+                payload = resolve_patch(post, payload)
+            except VersionConflict as e:
+                return JsonResponse({'success': False, 'message': 'Post was changed by someone else',
+                                     'version': e.current}, status=409)
+            except PatchError as e:
+                return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+        changed = []
+        for f in ('title', 'excerpt', 'content', 'content_json', 'featured_image'):
+            if f in payload and getattr(post, f) != payload[f]:
+                setattr(post, f, payload[f])
+                changed.append(f)
+        if payload.get('published_at'):
+            from django.utils.dateparse import parse_datetime, parse_date
+            dt = parse_datetime(payload['published_at']) or parse_date(payload['published_at'])
+            if dt and dt != post.published_at:
+                post.published_at = dt
+                changed.append('published_at')
+
+        if post.pk and not changed:
+            return JsonResponse({'success': True, 'id': post.id, 'version': post_version(post)})
         try:
-            if reversion:
-                with reversion.create_revision():
-                    reversion.set_user(request.user)
-                    reversion.set_comment("Autosave")
+            # existing posts: write only the changed columns
+            with transaction.atomic():
+                post.save(update_fields=changed + ['updated_at'] if post.pk else None)
+            try:
+                if reversion:
+                    with reversion.create_revision():
+                        reversion.set_user(request.user)
+                        reversion.set_comment("Autosave")
+            except Exception:
+                logger.debug("reversion skipped", exc_info=True)
+            return JsonResponse({'success': True, 'id': post.id, 'version': post_version(post)})
         except Exception:
-            logger.debug("reversion skipped", exc_info=True)
-        return JsonResponse({'success': True, 'id': post.id})
-    except Exception:
-        logger.exception("Autosave failed")
-        return JsonResponse({'success': False, 'message': 'save_failed'}, status=500)
+            logger.exception("Autosave failed")
+            return JsonResponse({'success': False, 'message': 'save_failed'}, status=500)
 
 
 @require_POST
@@ -767,24 +793,37 @@ def admin_post_update_view(request):
     ALLOWED = {'title', 'status', 'published_at'}
     if field not in ALLOWED:
         return JsonResponse({'success': False, 'message': 'Field not allowed'}, status=400)
-    try:
-        post = Post.objects.get(pk=post_id)
-    except Exception:
-        return JsonResponse({'success': False, 'message': 'Post not found'}, status=404)
-    if field == 'published_at':
-        from django.utils.dateparse import parse_datetime, parse_date
-        dt = parse_datetime(value) or parse_date(value)
-        if not dt:
-            return JsonResponse({'success': False, 'message': 'Invalid datetime'}, status=400)
-        post.published_at = dt
-    else:
+    # version check and save in one transaction, the row locked in between
+    with transaction.atomic():
+        try:
+            post = Post.objects.select_for_update().get(pk=post_id)
+        except Exception:
+            return JsonResponse({'success': False, 'message': 'Post not found'}, status=404)
+        try:
+            check_base_version(post, data.get('base_version'))
+        except VersionConflict as e:
+            return JsonResponse({'success': False, 'message': 'Post was changed by someone else',
+                                 'version': e.current}, status=409)
+        except PatchError as e:
+            return JsonResponse({'success': False, 'message': str(e)}, status=400)
+        if field == 'published_at':
+            from django.utils.dateparse import parse_datetime, parse_date
+            dt = parse_datetime(value) or parse_date(value)
+            if not dt:
+                return JsonResponse({'success': False, 'message': 'Invalid datetime'}, status=400)
+            value = dt
+        if getattr(post, field) == value:
+            return JsonResponse({'success': True, 'post_id': post.id, 'field': field, 'value': getattr(post, field),
+                                 'version': post_version(post)})
         setattr(post, field, value)
-    try:
-        post.save()
-        return JsonResponse({'success': True, 'post_id': post.id, 'field': field, 'value': getattr(post, field)})
-    except Exception:
-        logger.exception("Inline update failed")
-        return JsonResponse({'success': False, 'message': 'save_failed'}, status=500)
+        try:
+            with transaction.atomic():
+                post.save(update_fields=[field, 'updated_at'])
+            return JsonResponse({'success': True, 'post_id': post.id, 'field': field, 'value': getattr(post, field),
+                                 'version': post_version(post)})
+        except Exception:
+            logger.exception("Inline update failed")
+            return JsonResponse({'success': False, 'message': 'save_failed'}, status=500)
 
 
 @require_GET
@@ -7,4 +7,5 @@ class BlogConfig(AppConfig):
 
     def ready(self):
         # Импортируем сигналы для регистрации
-        from . import revalidation
\ No newline at end of file
+        from . import revalidation
+        from . import signals
\ No newline at end of file
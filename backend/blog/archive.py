@@ -0,0 +1,110 @@
+# backend/blog/archive.py
+"""
+Date archive ("March 2025 (12)").
+
+ArchiveMonth keeps the number of published posts per (year, month) of
+published_at in the site time zone (settings.TIME_ZONE). blog/signals.py
+moves a post between months as its status/published_at change and on delete,
+with F() updates inside the saving transaction. Bulk queryset.update() skips
+signals: callers doing that (admin publish/draft actions) run
+rebuild_archive(), as does `manage.py rebuild_archive`.
+
+Posts scheduled for the future are counted in their month already; the
+public histogram subtracts them with a range scan over the few future rows,
+skipped entirely when nothing is scheduled (blog/scheduling.py).
+"""
+import logging
+from collections import Counter
+from datetime import datetime
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import ExtractMonth, ExtractYear
+from django.utils import timezone
+
+from .models import Post, ArchiveMonth
+from .scheduling import next_scheduled_publish
+
+logger = logging.getLogger(__name__)
+
+
+def month_of(published_at):
+    local = timezone.localtime(published_at)
+    return local.year, local.month
+
+
+def month_range(year, month):
+    """[start, end) of a month in the site time zone, as aware datetimes."""
+    tz = timezone.get_default_timezone()
+    start = datetime(year, month, 1, tzinfo=tz)
+    end = datetime(year + (month == 12), month % 12 + 1, 1, tzinfo=tz)
+    return start, end
+
+
+def archived_month(visibility):
+    """(year, month) a post with this (status, published_at) is counted in, or None."""
+    status, published_at = visibility
+    if status != 'published' or published_at is None:
+        return None
+    return month_of(published_at)
+
+
+def apply_delta(year, month, delta):
+    updated = ArchiveMonth.objects.filter(year=year, month=month).update(post_count=F('post_count') + delta)
+    if not updated and delta > 0:
+        ArchiveMonth.objects.get_or_create(year=year, month=month, defaults={'post_count': 0})
+        ArchiveMonth.objects.filter(year=year, month=month).update(post_count=F('post_count') + delta)
+
+
+def record_visibility_change(old_visibility, new_visibility):
+    """Move one post between months; either side may be None (created / deleted)."""
+    old = archived_month(old_visibility) if old_visibility else None
+    new = archived_month(new_visibility) if new_visibility else None
+    if old == new:
+        return
+    if old:
+        apply_delta(*old, -1)
+    if new:
+        apply_delta(*new, 1)
+
+
+def rebuild_archive():
+    """Recount every month from Post. Returns the number of non-empty months."""
+    tz = timezone.get_default_timezone()
+    # scheduled posts are counted too; archive_months() subtracts them until they go live
+    rows = (Post.objects.published(scheduled=True)
+            .annotate(y=ExtractYear('published_at', tzinfo=tz), m=ExtractMonth('published_at', tzinfo=tz))
+            .values('y', 'm').annotate(n=Count('id')).order_by())
+    counts = {(row['y'], row['m']): row['n'] for row in rows}
+    with transaction.atomic():
+        ArchiveMonth.objects.all().delete()
+        ArchiveMonth.objects.bulk_create(
+            [ArchiveMonth(year=y, month=m, post_count=n) for (y, m), n in counts.items()])
+    return len(counts)
+
+
+def archive_months():
+    """[{'year', 'month', 'count'}] of months with visible posts, newest first."""
+    months = list(ArchiveMonth.objects.filter(post_count__gt=0)
+                  .order_by('-year', '-month').values_list('year', 'month', 'post_count'))
+    scheduled = Counter()
+    try:
+        if next_scheduled_publish() is not None:
+            future = Post.objects.filter(status='published', published_at__gt=timezone.now())
+            scheduled.update(month_of(published_at) for published_at in future.values_list('published_at', flat=True))
+    except Exception:
+        logger.exception("archive: could not subtract scheduled posts")
+    result = []
+    for year, month, count in months:
+        count -= scheduled[(year, month)]
+        if count > 0:
+            result.append({'year': year, 'month': month, 'count': count})
+    return result
+
+
+def archive_years(months):
+    """Per-year totals of archive_months() output, newest first."""
+    totals = Counter()
+    for entry in months:
+        totals[entry['year']] += entry['count']
+    return [{'year': year, 'count': totals[year]} for year in sorted(totals, reverse=True)]
@@ -0,0 +1,105 @@
+# backend/blog/autocomplete.py
+"""
+Search-as-you-type suggestions for post titles and tag names.
+
+On PostgreSQL the lookup uses pg_trgm (GIN gin_trgm_ops indexes on
+Post.title and Tag.title, see migration 0010): candidates match by word
+similarity (typo tolerant) or substring, and are ranked by
+TrigramWordSimilarity. Other backends fall back to icontains with prefix
+matches first.
+
+Typing produces the same short prefixes over and over, so results are kept
+in a small per-process LRU (PrefixCache) for AUTOCOMPLETE_CACHE_TTL seconds;
+a changed title shows up in suggestions after at most that long.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, IntegerField, Q, Value, When
+
+from .models import Post, Tag
+
+AUTOCOMPLETE_MIN_LENGTH = getattr(settings, 'BLOG_AUTOCOMPLETE_MIN_LENGTH', 2)
+AUTOCOMPLETE_MAX_LENGTH = 64
+AUTOCOMPLETE_LIMIT = getattr(settings, 'BLOG_AUTOCOMPLETE_LIMIT', 8)
+AUTOCOMPLETE_TAG_LIMIT = getattr(settings, 'BLOG_AUTOCOMPLETE_TAG_LIMIT', 5)
+AUTOCOMPLETE_CACHE_SIZE = getattr(settings, 'BLOG_AUTOCOMPLETE_CACHE_SIZE', 1024)
+AUTOCOMPLETE_CACHE_TTL = getattr(settings, 'BLOG_AUTOCOMPLETE_CACHE_TTL', 60)
+
+
+class PrefixCache:
+    """Thread-safe LRU of normalized query -> result with a per-entry TTL."""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+prefix_cache = PrefixCache(AUTOCOMPLETE_CACHE_SIZE, AUTOCOMPLETE_CACHE_TTL)
+
+
+def normalize_query(value):
+    return ' '.join((value or '').lower().split())[:AUTOCOMPLETE_MAX_LENGTH]
+
+
+def _ranked(queryset, query, limit):
+    if connection.vendor == 'postgresql':
+        return (queryset
+                .filter(Q(title__trigram_word_similar=query) | Q(title__icontains=query))
+                .annotate(similarity=TrigramWordSimilarity(query, 'title'))
+                .order_by('-similarity', 'title')[:limit])
+    return (queryset
+            .filter(title__icontains=query)
+            .annotate(prefix=Case(When(title__istartswith=query, then=Value(0)), default=Value(1),
+                                  output_field=IntegerField()))
+            .order_by('prefix', 'title')[:limit])
+
+
+def suggest(query):
+    """{'posts': [...], 'tags': [...]} for a normalized query; served from the prefix cache when possible."""
+    cached = prefix_cache.get(query)
+    if cached is not None:
+        return cached
+
+    posts = Post.objects.published()
+    result = {
+        'posts': [
+            {'id': pk, 'title': title, 'slug': slug}
+            for pk, title, slug in _ranked(posts, query, AUTOCOMPLETE_LIMIT).values_list('id', 'title', 'slug')
+        ],
+        'tags': [
+            {'id': pk, 'title': title, 'slug': slug}
+            for pk, title, slug in _ranked(Tag.objects.all(), query, AUTOCOMPLETE_TAG_LIMIT).values_list('id', 'title', 'slug')
+        ],
+    }
+    prefix_cache.set(query, result)
+    return result
@@ -0,0 +1,183 @@
+# backend/blog/cache.py
+"""
+Response cache for the public blog API.
+
+Entries are keyed by a global "generation" number plus the normalized request
+(path + sorted query params). Any change to content that can appear in a
+response bumps the generation (see blog/signals.py), which makes every older
+entry unreachable at once — no key scanning, no per-entry invalidation.
+
+The same mixin sets HTTP caching headers on public reads so an edge cache can
+serve them: Cache-Control from a per-action policy, a weak ETag derived from
+the generation-keyed entry (If-None-Match answers 304 without touching the
+cache or the database) and Surrogate-Key / Cache-Tag headers that
+blog/purge.py purges on writes.
+"""
+import hashlib
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .purge import SURROGATE_KEY_ALL
+from .scheduling import cap_timeout
+
+logger = logging.getLogger(__name__)
+
+GENERATION_KEY = 'blog:api:generation'
+API_CACHE_TIMEOUT = getattr(settings, 'BLOG_API_CACHE_TIMEOUT', 300)
+# browser / edge lifetimes of public responses: (max-age, s-maxage)
+DEFAULT_HTTP_CACHE_POLICY = (
+    getattr(settings, 'BLOG_HTTP_MAX_AGE', 60),
+    getattr(settings, 'BLOG_HTTP_S_MAXAGE', 300),
+)
+
+
+def get_generation(key=GENERATION_KEY):
+    """
+    Current value of a shared generation counter (the API cache's by default;
+    blog/taxonomy.py keeps its own under another key).
+    """
+    try:
+        gen = cache.get(key)
+        if gen is None:
+            # start from a timestamp so a lost key never resurrects entries of an old generation
+            cache.add(key, int(time.time() * 1000), None)
+            gen = cache.get(key)
+        return gen
+    except Exception:
+        logger.exception("blog cache: could not read generation key %s", key)
+        return None
+
+
+def bump_generation(key=GENERATION_KEY):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # key missing (evicted / never set) — a fresh timestamp is newer than any old generation
+        cache.set(key, int(time.time() * 1000), None)
+    except Exception:
+        logger.exception("blog cache: could not bump generation key %s", key)
+
+
+def normalized_request_key(request, namespace):
+    """
+    Build a stable key from the path and the query params, independent of param order.
+    Empty params are dropped so ?page=&search= and no params share one entry.
+    """
+    params = []
+    for key, values in sorted(request.query_params.lists()):
+        values = sorted(v for v in values if v != '')
+        if values:
+            params.append(f"{key}={','.join(values)}")
+    raw = f"{request.path}?{'&'.join(params)}"
+    return f"{namespace}:{hashlib.md5(raw.encode('utf-8')).hexdigest()}"
+
+
+def should_bypass_cache(request):
+    if request.method != 'GET':
+        return True
+    user = getattr(request, 'user', None)
+    if user is not None and getattr(user, 'is_staff', False):
+        return True
+    params = request.query_params
+    return 'preview' in params or 'preview_token' in params
+
+
+class CachedReadMixin:
+    """
+    ViewSet mixin caching anonymous/public list and retrieve responses.
+
+    Only 200 responses are stored (response.data and its surrogate keys, before
+    rendering). Staff and preview requests always hit the database and are
+    marked private. Cache backend errors are logged and the request falls
+    through to the normal path.
+
+    cache_policies maps an action to (max-age, s-maxage); other actions use
+    DEFAULT_HTTP_CACHE_POLICY. surrogate_key_prefix names detail keys
+    ("post" -> "post-<id>"); list keys are "<cache_namespace>-list".
+    """
+    cache_namespace = None
+    cache_timeout = None
+    cache_policies = {}
+    surrogate_key_prefix = None
+
+    def get_cache_timeout(self):
+        timeout = self.cache_timeout if self.cache_timeout is not None else API_CACHE_TIMEOUT
+        # a scheduled post changes public responses without any write
+        return cap_timeout(timeout)
+
+    def get_object(self):
+        obj = super().get_object()
+        self._surrogate_object = obj
+        return obj
+
+    def get_surrogate_keys(self, response):
+        namespace = self.cache_namespace or self.__class__.__name__.lower()
+        keys = [SURROGATE_KEY_ALL]
+        if getattr(self, 'detail', False):
+            obj = getattr(self, '_surrogate_object', None)
+            pk = obj.pk if obj is not None else (response.data.get('id') if isinstance(response.data, dict) else None)
+            if pk is not None:
+                keys.append(f"{self.surrogate_key_prefix or namespace}-{pk}")
+        else:
+            keys.append(f"{namespace}-list")
+        return keys
+
+    def set_http_cache_headers(self, response, etag, surrogate_keys):
+        max_age, s_maxage = self.cache_policies.get(self.action, DEFAULT_HTTP_CACHE_POLICY)
+        response['Cache-Control'] = f"public, max-age={cap_timeout(max_age)}, s-maxage={cap_timeout(s_maxage)}"
+        response['ETag'] = etag
+        if surrogate_keys:
+            response['Surrogate-Key'] = ' '.join(surrogate_keys)
+            response['Cache-Tag'] = ','.join(surrogate_keys)
+
+    def cached_response(self, request, handler, *args, **kwargs):
+        if should_bypass_cache(request):
+            response = handler(request, *args, **kwargs)
+            response['Cache-Control'] = 'private, no-store'
+            return response
+
+        gen = get_generation()
+        if gen is None:
+            return handler(request, *args, **kwargs)
+
+        namespace = self.cache_namespace or self.__class__.__name__.lower()
+        # v2: entries are {'data', 'keys'}
+        key = f"blog:api:v2:{gen}:{normalized_request_key(request, f'{namespace}:{self.action}')}"
+        # the entry key already encodes the generation, so it doubles as a validator
+        etag = f'W/"{hashlib.md5(key.encode("utf-8")).hexdigest()[:20]}"'
+        if etag in [t.strip() for t in request.META.get('HTTP_IF_NONE_MATCH', '').split(',')]:
+            response = Response(status=304)
+            self.set_http_cache_headers(response, etag, None)
+            return response
+
+        try:
+            entry = cache.get(key)
+        except Exception:
+            logger.exception("blog cache: get failed for %s", key)
+            entry = None
+        if entry is not None:
+            response = Response(entry['data'])
+            response['X-Cache'] = 'HIT'
+            self.set_http_cache_headers(response, etag, entry['keys'])
+            return response
+
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            surrogate_keys = self.get_surrogate_keys(response)
+            try:
+                cache.set(key, {'data': response.data, 'keys': surrogate_keys}, self.get_cache_timeout())
+            except Exception:
+                logger.exception("blog cache: set failed for %s", key)
+            response['X-Cache'] = 'MISS'
+            self.set_http_cache_headers(response, etag, surrogate_keys)
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(request, super().list, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(request, super().retrieve, *args, **kwargs)
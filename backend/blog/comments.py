@@ -0,0 +1,79 @@
+# backend/blog/comments.py
+"""
+Threaded comment loading.
+
+Comments carry a materialized path (see Comment.path), so a page of threads is
+two indexed range queries regardless of depth: one for the page of root
+comments, one for everything inside their subtrees. The tree is assembled in
+Python and attached to each comment as `thread_replies`, which
+CommentSerializer uses instead of querying `replies` per comment.
+"""
+from django.conf import settings
+
+from .models import Comment
+
+COMMENTS_PAGE_SIZE = getattr(settings, 'BLOG_COMMENTS_PAGE_SIZE', 20)
+COMMENTS_MAX_PAGE_SIZE = 100
+# Comment.path holds one PATH_SEGMENT_WIDTH + "/" segment per level, so deeper
+# replies than this would not fit into the column
+COMMENT_MAX_DEPTH = min(
+    getattr(settings, 'BLOG_COMMENT_MAX_DEPTH', 50),
+    Comment._meta.get_field('path').max_length // (Comment.PATH_SEGMENT_WIDTH + 1),
+)
+
+# sorts after every digit and "/" — the upper bound of a subtree's path range
+_PATH_SUBTREE_END = '~'
+
+
+def reply_too_deep(parent_id):
+    """
+    True when a reply to `parent_id` would be nested deeper than COMMENT_MAX_DEPTH.
+    """
+    if not parent_id:
+        return False
+    parent_path = Comment.objects.filter(pk=parent_id).values_list('path', flat=True).first() or ''
+    return parent_path.count('/') >= COMMENT_MAX_DEPTH
+
+
+def build_comment_tree(comments):
+    """
+    Given public comments ordered by path, attach `thread_replies` lists and return roots.
+    Replies whose parent is missing from the set (e.g. a hidden parent) are dropped
+    together with their subtree, matching the old per-level is_public filtering.
+    """
+    by_id = {}
+    roots = []
+    for comment in comments:
+        comment.thread_replies = []
+        if comment.parent_id is None:
+            roots.append(comment)
+        elif comment.parent_id in by_id:
+            by_id[comment.parent_id].thread_replies.append(comment)
+        else:
+            continue
+        by_id[comment.pk] = comment
+    return roots
+
+
+def load_thread_page(post_id, after=None, limit=None):
+    """
+    Return (roots, has_more) for one page of public threads of a post.
+    `after` is the id of the last root of the previous page.
+    """
+    limit = max(1, min(int(limit or COMMENTS_PAGE_SIZE), COMMENTS_MAX_PAGE_SIZE))
+    public = Comment.objects.filter(post_id=post_id, is_public=True).select_related('user')
+
+    root_paths = public.filter(parent__isnull=True).order_by('path')
+    if after:
+        root_paths = root_paths.filter(path__gt=Comment.path_segment(int(after)))
+    root_paths = list(root_paths.values_list('path', flat=True)[:limit + 1])
+    has_more = len(root_paths) > limit
+    root_paths = root_paths[:limit]
+    if not root_paths:
+        return [], False
+
+    thread = public.filter(
+        path__gte=root_paths[0],
+        path__lte=root_paths[-1] + _PATH_SUBTREE_END,
+    ).order_by('path')
+    return build_comment_tree(thread), has_more
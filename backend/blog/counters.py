@@ -0,0 +1,78 @@
+# backend/blog/counters.py
+"""
+Denormalized engagement counters on Post (comments_count, likes_count, views_count).
+
+Write paths call bump_counter() with an F() expression, so concurrent writers never
+lose increments. reconcile_post_counters() recomputes everything from the source
+tables and is used by `manage.py reconcile_post_counters` to repair drift.
+"""
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Post, Comment, PostReaction, PostView
+
+COUNTER_FIELDS = ('comments_count', 'likes_count', 'views_count')
+
+
+def bump_counter(post_id, field, delta):
+    if not post_id or not delta:
+        return
+    if field not in COUNTER_FIELDS:
+        raise ValueError(f"Unknown counter field: {field}")
+    expr = F(field) + delta if delta > 0 else Greatest(F(field) + delta, Value(0))
+    Post.objects.filter(pk=post_id).update(**{field: expr})
+
+
+def _count_subquery(queryset, group_field):
+    return Coalesce(
+        Subquery(
+            queryset.order_by().values(group_field).annotate(n=Count('pk')).values('n')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+
+
+def actual_counter_expressions(apps=None):
+    """
+    Expressions computing each counter from the source tables, for use in annotate()/update().
+    Migrations pass their `apps` registry to build them over the historical models.
+    """
+    comment_model, reaction_model, view_model = (Comment, PostReaction, PostView) if apps is None else (
+        apps.get_model('blog', 'Comment'), apps.get_model('blog', 'PostReaction'), apps.get_model('blog', 'PostView'))
+    likes_through = reaction_model.users.through
+    comments = _count_subquery(comment_model.objects.filter(post_id=OuterRef('pk'), is_public=True), 'post_id')
+    views = _count_subquery(view_model.objects.filter(post_id=OuterRef('pk')), 'post_id')
+    user_likes = _count_subquery(likes_through.objects.filter(postreaction__post_id=OuterRef('pk')), 'postreaction__post_id')
+    anon_likes = Coalesce(
+        Subquery(
+            reaction_model.objects.filter(post_id=OuterRef('pk')).order_by()
+            .values('post_id').annotate(n=Sum('anon_count')).values('n')[:1],
+            output_field=IntegerField(),
+        ),
+        Value(0),
+    )
+    return {
+        'comments_count': comments,
+        'likes_count': anon_likes + user_likes,
+        'views_count': views,
+    }
+
+
+def reconcile_post_counters(queryset=None):
+    """
+    Rewrite counters from the source tables. Returns the number of posts whose
+    counters had drifted (only those rows are updated).
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    actual = actual_counter_expressions()
+    drifted = (queryset
+               .annotate(**{f'actual_{name}': expr for name, expr in actual.items()})
+               .filter(~Q(comments_count=F('actual_comments_count'))
+                       | ~Q(likes_count=F('actual_likes_count'))
+                       | ~Q(views_count=F('actual_views_count')))
+               .values_list('pk', flat=True))
+    drifted_ids = list(drifted)
+    if drifted_ids:
+        Post.objects.filter(pk__in=drifted_ids).update(**actual_counter_expressions())
+    return len(drifted_ids)
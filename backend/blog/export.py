@@ -0,0 +1,86 @@
+# backend/blog/export.py
+"""
+Full-corpus NDJSON export for static site builds.
+
+One streamed response instead of paging /posts/ and fetching every detail:
+
+- line 1 is {"type": "meta", "generated_at": ...}; an incremental build passes
+  that value back as ?updated_since= next time;
+- then {"type": "deleted", "id", "slug"} for posts that stopped being public
+  since then (unpublished, rescheduled or deleted; PostTombstone keeps the
+  deleted ones), in full mode there are none;
+- then one {"type": "post", ...} line per public post (PostExportSerializer).
+
+Posts are read from a server-side cursor (QuerySet.iterator) in chunks of
+EXPORT_CHUNK_SIZE; attachments are prefetched and taxonomy attached from the
+snapshot per chunk, so memory stays bounded by the chunk size.
+"""
+import hmac
+import json
+import logging
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Post, PostTombstone
+from .serializers import PostExportSerializer
+
+logger = logging.getLogger(__name__)
+
+EXPORT_CHUNK_SIZE = getattr(settings, 'BLOG_EXPORT_CHUNK_SIZE', 200)
+
+
+def export_token_valid(request):
+    """Bearer token (or X-Export-Token) matching settings.BLOG_EXPORT_TOKEN; no token configured = closed."""
+    expected = getattr(settings, 'BLOG_EXPORT_TOKEN', None)
+    if not expected:
+        return False
+    auth = request.META.get('HTTP_AUTHORIZATION', '')
+    given = auth[7:] if auth.startswith('Bearer ') else request.META.get('HTTP_X_EXPORT_TOKEN', '')
+    return hmac.compare_digest(given.encode('utf-8'), str(expected).encode('utf-8'))
+
+
+def _line(record):
+    return (json.dumps(record, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _removed_since(since, now):
+    """(id, slug) of posts that were possibly public at `since` and are not public now."""
+    not_public = Post.objects.filter(updated_at__gte=since).unpublished(now)
+    yield from not_public.values_list('id', 'slug').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    yield from (PostTombstone.objects.filter(deleted_at__gte=since)
+                .values_list('post_id', 'slug').iterator(chunk_size=EXPORT_CHUNK_SIZE))
+
+
+def iter_export(updated_since=None, request=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield the NDJSON export as encoded lines."""
+    now = timezone.now()
+    yield _line({'type': 'meta', 'generated_at': now, 'updated_since': updated_since})
+
+    posts = Post.objects.published(now)
+    if updated_since is not None:
+        for post_id, slug in _removed_since(updated_since, now):
+            yield _line({'type': 'deleted', 'id': post_id, 'slug': slug})
+        # scheduled posts become public without a write: their published_at is the change time
+        posts = posts.filter(Q(updated_at__gte=updated_since) | Q(published_at__gte=updated_since))
+
+    posts = (posts.select_related('author', 'cover_attachment').prefetch_related('attachments')
+             .order_by('id'))
+    context = {'request': request}
+    for chunk in _chunks(posts.iterator(chunk_size=chunk_size), chunk_size):
+        # ListSerializer attaches the taxonomy snapshot once per chunk
+        for data in PostExportSerializer(chunk, many=True, context=context).data:
+            yield _line({'type': 'post', **data})
@@ -0,0 +1,202 @@
+# backend/blog/feeds.py
+"""
+Prebuilt sitemap and RSS/Atom documents.
+
+Each document ("section") is built once from a streaming iterator over the
+published posts and stored in the cache together with its ETag and
+Last-Modified. Post changes only drop the sections they affect (see
+blog/signals.py): the sitemap chunk holding the post, the sitemap index
+and the two feeds. Sitemap chunks are fixed id ranges of SITEMAP_CHUNK_SIZE
+posts, so a post always lives in the same chunk and the index splits
+automatically once ids pass the 50k-URL sitemap limit. The index lists only
+chunks holding published posts; a chunk that has since emptied serves an
+empty urlset, chunks past the highest published id a 404.
+"""
+import hashlib
+import io
+import logging
+import os
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max
+from django.http import HttpResponse, HttpResponseNotModified, Http404
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import http_date, parse_http_date_safe, quote_etag
+from django.views.decorators.http import require_GET
+
+from .models import Post
+from .scheduling import cap_timeout
+
+logger = logging.getLogger(__name__)
+
+FRONTEND_URL = getattr(settings, "FRONTEND_URL", os.getenv("FRONTEND_URL", "https://positive-theta.vercel.app")).rstrip('/')
+SITEMAP_CHUNK_SIZE = getattr(settings, 'BLOG_SITEMAP_CHUNK_SIZE', 50000)
+FEED_ITEMS = getattr(settings, 'BLOG_FEED_ITEMS', 20)
+FEED_TITLE = getattr(settings, 'BLOG_FEED_TITLE', 'Positive Theta — блог')
+FEED_DESCRIPTION = getattr(settings, 'BLOG_FEED_DESCRIPTION', 'Новые публикации блога')
+FEED_CACHE_TIMEOUT = getattr(settings, 'BLOG_FEED_CACHE_TIMEOUT', 60 * 60 * 24)
+
+SECTION_INDEX = 'sitemap-index'
+SECTION_RSS = 'rss'
+SECTION_ATOM = 'atom'
+
+
+def _cache_key(section):
+    return f"blog:feeds:{section}"
+
+
+def sitemap_chunk_for(post_id):
+    return (int(post_id) - 1) // SITEMAP_CHUNK_SIZE
+
+
+def post_url(slug):
+    return f"{FRONTEND_URL}/blog/{slug}"
+
+
+def invalidate_sections(*sections):
+    try:
+        cache.delete_many([_cache_key(s) for s in sections])
+    except Exception:
+        logger.exception("feeds: could not invalidate %s", sections)
+
+
+def invalidate_for_post(post_id):
+    """Drop every prebuilt document a (formerly) published post appears in."""
+    invalidate_sections(f"sitemap-{sitemap_chunk_for(post_id)}", SECTION_INDEX, SECTION_RSS, SECTION_ATOM)
+
+
+# ---------------------------
+# Builders: each returns (body bytes, last_modified datetime)
+# ---------------------------
+def build_sitemap_chunk(chunk, request):
+    """One <urlset> for posts with ids in the chunk's range, read with a streaming iterator."""
+    low = chunk * SITEMAP_CHUNK_SIZE + 1
+    rows = (Post.objects.published().filter(id__gte=low, id__lt=low + SITEMAP_CHUNK_SIZE).order_by('id')
+            .values_list('slug', 'updated_at').iterator(chunk_size=2000))
+    buf = io.StringIO()
+    buf.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    buf.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    last_modified = None
+    for slug, updated_at in rows:
+        last_modified = updated_at if last_modified is None else max(last_modified, updated_at)
+        buf.write(f"<url><loc>{escape(post_url(slug))}</loc>"
+                  f"<lastmod>{updated_at.date().isoformat()}</lastmod></url>\n")
+    buf.write('</urlset>\n')
+    if last_modified is None and chunk > 0:
+        # an emptied chunk below the last post is an empty urlset (a cached index may list it);
+        # past it nothing is built, so arbitrary chunk numbers can't fill the cache
+        max_id = Post.objects.published().aggregate(m=Max('id'))['m'] or 0
+        if chunk > sitemap_chunk_for(max_id):
+            raise Http404("No such sitemap")
+    return buf.getvalue().encode('utf-8'), last_modified
+
+
+def build_sitemap_index(request):
+    """Lists the chunks that hold published posts, from one grouped query over the same rows."""
+    chunks = dict(Post.objects.published()
+                  .annotate(chunk=(F('id') - 1) / SITEMAP_CHUNK_SIZE)
+                  .values('chunk').annotate(m=Max('updated_at'))
+                  .order_by('chunk').values_list('chunk', 'm'))
+    last_modified = max(chunks.values()) if chunks else None
+    buf = io.StringIO()
+    buf.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    buf.write('<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+    for chunk, chunk_modified in (chunks or {0: None}).items():
+        loc = request.build_absolute_uri(reverse('blog:sitemap-posts', kwargs={'chunk': chunk}))
+        lastmod = f"<lastmod>{chunk_modified.date().isoformat()}</lastmod>" if chunk_modified else ''
+        buf.write(f"<sitemap><loc>{escape(loc)}</loc>{lastmod}</sitemap>\n")
+    buf.write('</sitemapindex>\n')
+    return buf.getvalue().encode('utf-8'), last_modified
+
+
+def build_feed(feed_class, request):
+    feed = feed_class(
+        title=FEED_TITLE,
+        link=f"{FRONTEND_URL}/blog",
+        description=FEED_DESCRIPTION,
+        language=getattr(settings, 'LANGUAGE_CODE', 'ru'),
+        feed_url=request.build_absolute_uri(),
+    )
+    posts = (Post.objects.published().order_by('-published_at')
+             .only('id', 'title', 'slug', 'excerpt', 'auto_excerpt', 'published_at', 'updated_at')
+             .prefetch_related('categories')[:FEED_ITEMS])
+    last_modified = None
+    for post in posts:
+        last_modified = max(filter(None, [last_modified, post.updated_at]))
+        feed.add_item(
+            title=post.title,
+            link=post_url(post.slug),
+            description=post.excerpt or post.auto_excerpt,
+            unique_id=post_url(post.slug),
+            pubdate=post.published_at,
+            updateddate=post.updated_at,
+            categories=[c.title for c in post.categories.all()],
+        )
+    buf = io.StringIO()
+    feed.write(buf, 'utf-8')
+    return buf.getvalue().encode('utf-8'), last_modified
+
+
+# ---------------------------
+# Serving
+# ---------------------------
+def get_document(section, builder):
+    doc = None
+    try:
+        doc = cache.get(_cache_key(section))
+    except Exception:
+        logger.exception("feeds: cache get failed for %s", section)
+    if doc is None:
+        body, last_modified = builder()
+        doc = {
+            'body': body,
+            'etag': hashlib.md5(body).hexdigest(),
+            'last_modified': last_modified or timezone.now(),
+        }
+        try:
+            cache.set(_cache_key(section), doc, cap_timeout(FEED_CACHE_TIMEOUT))
+        except Exception:
+            logger.exception("feeds: cache set failed for %s", section)
+    return doc
+
+
+def serve_document(request, section, builder, content_type):
+    doc = get_document(section, builder)
+    etag = quote_etag(doc['etag'])
+    last_modified = int(doc['last_modified'].timestamp())
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH')
+    if_modified_since = parse_http_date_safe(request.META.get('HTTP_IF_MODIFIED_SINCE') or '')
+    not_modified = (etag in [t.strip() for t in if_none_match.split(',')]) if if_none_match \
+        else (if_modified_since is not None and last_modified <= if_modified_since)
+    response = HttpResponseNotModified() if not_modified else HttpResponse(doc['body'], content_type=content_type)
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+@require_GET
+def sitemap_index_view(request):
+    return serve_document(request, SECTION_INDEX, lambda: build_sitemap_index(request), 'application/xml; charset=utf-8')
+
+
+@require_GET
+def sitemap_posts_view(request, chunk):
+    return serve_document(request, f"sitemap-{chunk}", lambda: build_sitemap_chunk(chunk, request),
+                          'application/xml; charset=utf-8')
+
+
+@require_GET
+def rss_feed_view(request):
+    return serve_document(request, SECTION_RSS, lambda: build_feed(Rss201rev2Feed, request),
+                          'application/rss+xml; charset=utf-8')
+
+
+@require_GET
+def atom_feed_view(request):
+    return serve_document(request, SECTION_ATOM, lambda: build_feed(Atom1Feed, request),
+                          'application/atom+xml; charset=utf-8')
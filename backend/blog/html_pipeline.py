@@ -0,0 +1,270 @@
+# backend/blog/html_pipeline.py
+"""
+Save-time processing of post bodies.
+
+render_content() runs once in Post.save (see Post.refresh_rendered_content) and
+its result is stored in Post.content_html / Post.toc, so the detail endpoint
+serves processed HTML without per-request work:
+
+- sanitizes with an allowlist of the tags/attributes the admin editors produce;
+- images get loading="lazy", decoding="async" and, when missing, width/height
+  from the per-URL dimensions cache (a cache read, never a fetch); the cache
+  is filled outside the request cycle by `manage.py probe_image_dimensions`,
+  which reads the first bytes of images on our own hosts (BLOG_HTML_IMAGE_PROBE);
+- h2..h4 headings get stable ids and are collected into a table of contents.
+"""
+import hashlib
+import logging
+import re
+from functools import partial
+from urllib.parse import urlparse
+
+import bleach
+import requests
+from bleach.html5lib_shim import Filter
+from django.conf import settings
+from django.core.cache import cache
+from PIL import ImageFile
+
+from .utils import translit_slugify
+
+logger = logging.getLogger(__name__)
+
+TOC_LEVELS = tuple(getattr(settings, 'BLOG_TOC_LEVELS', (2, 3, 4)))
+IMAGE_PROBE_ENABLED = getattr(settings, 'BLOG_HTML_IMAGE_PROBE', False)
+IMAGE_PROBE_TIMEOUT = getattr(settings, 'BLOG_HTML_IMAGE_PROBE_TIMEOUT', 3)
+IMAGE_PROBE_MAX_BYTES = getattr(settings, 'BLOG_HTML_IMAGE_PROBE_MAX_BYTES', 64 * 1024)
+IMAGE_PROBE_LIMIT = getattr(settings, 'BLOG_HTML_IMAGE_PROBE_LIMIT', 20)  # per document
+IMAGE_DIMENSIONS_CACHE_TIMEOUT = getattr(settings, 'BLOG_HTML_IMAGE_DIMENSIONS_CACHE_TIMEOUT', 60 * 60 * 24 * 30)
+IFRAME_HOSTS = set(getattr(settings, 'BLOG_HTML_IFRAME_HOSTS', (
+    'www.youtube.com', 'youtube.com', 'www.youtube-nocookie.com', 'player.vimeo.com',
+)))
+
+ALLOWED_TAGS = {
+    'p', 'br', 'hr', 'div', 'span',
+    'h1', 'h2', 'h3', 'h4', 'h5', 'h6',
+    'strong', 'b', 'em', 'i', 'u', 's', 'del', 'ins', 'mark', 'sub', 'sup', 'small',
+    'code', 'pre', 'blockquote', 'q', 'cite', 'abbr',
+    'ul', 'ol', 'li',
+    'a', 'img', 'figure', 'figcaption', 'picture', 'source',
+    'table', 'thead', 'tbody', 'tfoot', 'tr', 'th', 'td', 'caption', 'colgroup', 'col',
+    'oembed', 'iframe',
+}
+_COMMON_ATTRIBUTES = ['class', 'style', 'id', 'title', 'lang', 'dir']
+ALLOWED_ATTRIBUTES = {
+    '*': _COMMON_ATTRIBUTES,
+    'a': _COMMON_ATTRIBUTES + ['href', 'target', 'rel', 'name'],
+    'img': _COMMON_ATTRIBUTES + ['src', 'srcset', 'sizes', 'alt', 'width', 'height', 'loading', 'decoding'],
+    'source': ['srcset', 'sizes', 'media', 'type'],
+    'ol': _COMMON_ATTRIBUTES + ['start', 'reversed', 'type'],
+    'th': _COMMON_ATTRIBUTES + ['colspan', 'rowspan', 'scope'],
+    'td': _COMMON_ATTRIBUTES + ['colspan', 'rowspan'],
+    'col': _COMMON_ATTRIBUTES + ['span'],
+    'pre': _COMMON_ATTRIBUTES + ['data-language'],
+    'oembed': ['url'],
+    'iframe': lambda tag, name, value: _allow_iframe_attribute(name, value),
+}
+ALLOWED_PROTOCOLS = {'http', 'https', 'mailto', 'tel'}
+
+# Inline styles the editors emit (alignment, font colour/size, highlight, image width)
+ALLOWED_STYLE_PROPERTIES = {
+    'text-align', 'color', 'background-color', 'font-size', 'font-family', 'font-weight',
+    'font-style', 'text-decoration', 'width', 'height', 'max-width', 'margin-left', 'padding-left',
+    'float', 'vertical-align', 'border', 'border-collapse',
+}
+_STYLE_VALUE_RE = re.compile(r"[#\w\s.,%()'\"-]+")
+
+HEADING_TAGS = {f'h{level}' for level in TOC_LEVELS}
+
+# stripped tags keep their text, which is wrong for script/style bodies
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+
+
+def _allow_iframe_attribute(name, value):
+    if name == 'src':
+        return urlparse(value).scheme == 'https' and urlparse(value).hostname in IFRAME_HOSTS
+    return name in ('width', 'height', 'title', 'allow', 'allowfullscreen', 'frameborder', 'loading')
+
+
+class InlineStyleSanitizer:
+    """Minimal stand-in for bleach's CSSSanitizer (tinycss2 is not a dependency here)."""
+
+    def sanitize_css(self, style):
+        declarations = []
+        for declaration in (style or '').split(';'):
+            prop, _, value = declaration.partition(':')
+            prop, value = prop.strip().lower(), value.strip()
+            if (prop in ALLOWED_STYLE_PROPERTIES and value
+                    and _STYLE_VALUE_RE.fullmatch(value) and 'expression' not in value.lower()):
+                declarations.append(f"{prop}: {value}")
+        return '; '.join(declarations)
+
+
+# ---------------------------
+# Image dimensions
+# ---------------------------
+def _probe_image_size(src):
+    parser = ImageFile.Parser()
+    try:
+        # no redirects: an allowed host must not bounce the request somewhere else
+        with requests.get(src, stream=True, timeout=IMAGE_PROBE_TIMEOUT, allow_redirects=False,
+                          headers={'Range': f'bytes=0-{IMAGE_PROBE_MAX_BYTES - 1}'}) as resp:
+            if resp.status_code not in (200, 206):
+                return None
+            received = 0
+            for chunk in resp.iter_content(chunk_size=8192):
+                parser.feed(chunk)
+                if parser.image:
+                    return parser.image.size
+                received += len(chunk)
+                if received >= IMAGE_PROBE_MAX_BYTES:
+                    break
+    except Exception:
+        logger.warning("html pipeline: could not probe image size for %s", src, exc_info=True)
+    return None
+
+
+def probe_hosts():
+    """Hosts images may be probed on: our media/storage hosts (see ingest.own_hosts)."""
+    # imported here: blog.ingest imports the models, which import this module
+    from .ingest import own_hosts
+    return own_hosts()
+
+
+def _dimensions_key(src):
+    return "blog:imgdim:" + hashlib.md5(src.encode('utf-8')).hexdigest()
+
+
+def cached_image_dimensions(src):
+    """(found, size) from the dimensions cache only; found is False on a miss."""
+    if not src or not src.startswith(('http://', 'https://')):
+        return True, None
+    try:
+        cached = cache.get(_dimensions_key(src))
+    except Exception:
+        logger.exception("html pipeline: cache get failed for image dimensions")
+        return False, None
+    if cached is None:
+        return False, None
+    return True, tuple(cached) or None
+
+
+def image_dimensions(src, hosts=None):
+    """
+    (width, height) of an image on one of `hosts` (probe_hosts() by default), or
+    None. Fetches on a cache miss; results (and failures) are cached per URL.
+    """
+    found, size = cached_image_dimensions(src)
+    if found:
+        return size
+    try:
+        parsed = urlparse(src)
+        host = parsed.hostname
+    except ValueError:
+        return None
+    if parsed.scheme not in ('http', 'https') or not host:
+        return None
+    if host not in (probe_hosts() if hosts is None else hosts):
+        return None
+    key = _dimensions_key(src)
+    size = _probe_image_size(src)
+    try:
+        # failures are remembered for an hour so a broken image doesn't slow every save
+        cache.set(key, list(size or ()), IMAGE_DIMENSIONS_CACHE_TIMEOUT if size else 60 * 60)
+    except Exception:
+        logger.exception("html pipeline: cache set failed for image dimensions")
+    return size
+
+
+# ---------------------------
+# html5lib filters (run after sanitization)
+# ---------------------------
+class ImageAttributesFilter(Filter):
+    def __init__(self, source, probe_images=False):
+        super().__init__(source)
+        self.probes_left = IMAGE_PROBE_LIMIT if (probe_images and IMAGE_PROBE_ENABLED) else 0
+        self.hosts = probe_hosts() if self.probes_left else set()
+
+    def __iter__(self):
+        for token in super().__iter__():
+            if token['type'] in ('StartTag', 'EmptyTag') and token['name'] == 'img':
+                attrs = token['data']
+                attrs.setdefault((None, 'loading'), 'lazy')
+                attrs.setdefault((None, 'decoding'), 'async')
+                if (None, 'width') not in attrs or (None, 'height') not in attrs:
+                    src = attrs.get((None, 'src'))
+                    found, size = cached_image_dimensions(src)
+                    if not found and self.probes_left > 0:
+                        self.probes_left -= 1
+                        size = image_dimensions(src, self.hosts)
+                    if size:
+                        attrs[(None, 'width')], attrs[(None, 'height')] = str(size[0]), str(size[1])
+            yield token
+
+
+class HeadingAnchorFilter(Filter):
+    """Gives TOC-level headings unique ids and appends {'id', 'text', 'level'} entries to `toc`."""
+
+    def __init__(self, source, toc):
+        super().__init__(source)
+        self.toc = toc
+        self.used_ids = set()
+
+    def _unique_id(self, wanted):
+        base = translit_slugify(wanted)[:80].strip('-') or 'section'
+        candidate, n = base, 2
+        while candidate in self.used_ids:
+            candidate, n = f"{base}-{n}", n + 1
+        self.used_ids.add(candidate)
+        return candidate
+
+    def __iter__(self):
+        buffered = None
+        for token in super().__iter__():
+            if buffered is None:
+                if token['type'] == 'StartTag' and token['name'] in HEADING_TAGS:
+                    buffered = [token]
+                else:
+                    yield token
+                continue
+            buffered.append(token)
+            if token['type'] == 'EndTag' and token['name'] == buffered[0]['name']:
+                yield from self._anchor(buffered)
+                buffered = None
+        if buffered:
+            yield from buffered
+
+    def _anchor(self, tokens):
+        start = tokens[0]
+        text = ' '.join(''.join(
+            t['data'] for t in tokens if t['type'] in ('Characters', 'SpaceCharacters')
+        ).split())
+        if text:
+            anchor = self._unique_id(start['data'].get((None, 'id')) or text)
+            start['data'][(None, 'id')] = anchor
+            self.toc.append({'id': anchor, 'text': text, 'level': int(start['name'][1])})
+        return tokens
+
+
+def render_content(content, probe_images=False):
+    """
+    Return (html, toc) for a raw post body. Known image sizes always come from
+    the cache; probe_images also fetches unknown ones over the network, so
+    never pass it on a request/save path.
+    """
+    toc = []
+    if not content:
+        return '', toc
+    cleaner = bleach.Cleaner(
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+        strip_comments=True,
+        css_sanitizer=InlineStyleSanitizer(),
+        filters=[
+            partial(ImageAttributesFilter, probe_images=probe_images),
+            partial(HeadingAnchorFilter, toc=toc),
+        ],
+    )
+    return cleaner.clean(_SCRIPT_STYLE_RE.sub('', content)), toc
@@ -0,0 +1,176 @@
+# backend/blog/ingest.py
+"""
+Ingestion of externally hosted post images.
+
+featured_image / og_image may point at slow third-party hosts or full-size
+originals. ingest_post_images() collects every external URL, downloads them
+with a bounded thread pool, downsizes and re-encodes them as JPEG into
+default_storage and rewrites the posts to the stored URLs.
+
+Deduplication:
+- by source URL: an IngestedImage row per URL, reused on later runs;
+- by content: stored files are named after the SHA-256 of the original bytes,
+  so identical images behind different URLs are stored once.
+
+Worker threads only do network, Pillow and storage I/O; all database access
+stays in the calling thread.
+"""
+import hashlib
+import io
+import logging
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from urllib.parse import urlparse
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+from .cache import bump_generation
+from .models import Post, IngestedImage
+from .purge import post_keys, purge_keys
+
+logger = logging.getLogger(__name__)
+
+INGEST_WORKERS = getattr(settings, 'BLOG_INGEST_WORKERS', 4)
+INGEST_TIMEOUT = getattr(settings, 'BLOG_INGEST_TIMEOUT', 15)
+INGEST_MAX_BYTES = getattr(settings, 'BLOG_INGEST_MAX_BYTES', 25 * 1024 * 1024)
+INGEST_MAX_WIDTH = getattr(settings, 'BLOG_INGEST_MAX_WIDTH', 1600)
+INGEST_MAX_HEIGHT = getattr(settings, 'BLOG_INGEST_MAX_HEIGHT', 1600)
+INGEST_JPEG_QUALITY = getattr(settings, 'BLOG_INGEST_JPEG_QUALITY', 82)
+INGEST_STORAGE_DIR = getattr(settings, 'BLOG_INGEST_STORAGE_DIR', 'ingested')
+IMAGE_FIELDS = ('featured_image', 'og_image')
+
+# one writer per content hash, so two URLs with the same bytes in one run store one file
+_hash_locks = defaultdict(threading.Lock)
+_hash_locks_guard = threading.Lock()
+
+
+def own_hosts():
+    """Hosts whose images are already ours (storage, Supabase, extra BLOG_INGEST_SKIP_HOSTS)."""
+    hosts = set(getattr(settings, 'BLOG_INGEST_SKIP_HOSTS', ()))
+    for url in (getattr(settings, 'SUPABASE_URL', None), getattr(settings, 'MEDIA_URL', None)):
+        if url and urlparse(url).hostname:
+            hosts.add(urlparse(url).hostname)
+    try:
+        storage_host = urlparse(default_storage.url(f'{INGEST_STORAGE_DIR}/probe.jpg')).hostname
+        if storage_host:
+            hosts.add(storage_host)
+    except Exception:
+        logger.debug("ingest: storage has no public url", exc_info=True)
+    return hosts
+
+
+def is_external(url, hosts):
+    parsed = urlparse(url or '')
+    return parsed.scheme in ('http', 'https') and bool(parsed.hostname) and parsed.hostname not in hosts
+
+
+def _download(url):
+    with requests.get(url, timeout=INGEST_TIMEOUT, stream=True) as resp:
+        resp.raise_for_status()
+        data = resp.raw.read(INGEST_MAX_BYTES + 1, decode_content=True)
+    if len(data) > INGEST_MAX_BYTES:
+        raise ValueError(f"image larger than {INGEST_MAX_BYTES} bytes")
+    return data
+
+
+def _encode(data):
+    image = Image.open(io.BytesIO(data))
+    image = ImageOps.exif_transpose(image)
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        image = background
+    else:
+        image = image.convert('RGB')
+    image.thumbnail((INGEST_MAX_WIDTH, INGEST_MAX_HEIGHT), Image.LANCZOS)
+    buf = io.BytesIO()
+    image.save(buf, format='JPEG', quality=INGEST_JPEG_QUALITY, optimize=True, progressive=True)
+    return buf.getvalue(), image.size
+
+
+def fetch_and_store(url):
+    """Worker: download, re-encode and store one image. Returns a dict for IngestedImage."""
+    data = _download(url)
+    content_hash = hashlib.sha256(data).hexdigest()
+    name = f"{INGEST_STORAGE_DIR}/{content_hash[:2]}/{content_hash[:24]}.jpg"
+    with _hash_locks_guard:
+        lock = _hash_locks[content_hash]
+    with lock:
+        if default_storage.exists(name):
+            # same bytes already ingested from another URL (or by an interrupted run)
+            with default_storage.open(name) as fh:
+                width, height = Image.open(fh).size
+            size_bytes = default_storage.size(name)
+        else:
+            body, (width, height) = _encode(data)
+            name = default_storage.save(name, ContentFile(body))
+            size_bytes = len(body)
+    return {
+        'source_url': url,
+        'content_hash': content_hash,
+        'stored_name': name,
+        'url': default_storage.url(name),
+        'width': width,
+        'height': height,
+        'size_bytes': size_bytes,
+    }
+
+
+def ingest_urls(urls, workers=INGEST_WORKERS):
+    """
+    Ingest the given URLs (already-ingested ones are reused).
+    Returns ({source_url: stored url}, {source_url: error message}).
+    """
+    urls = set(urls)
+    mapping = dict(IngestedImage.objects.filter(source_url__in=urls).values_list('source_url', 'url'))
+    errors = {}
+    pending = urls - set(mapping)
+    if not pending:
+        return mapping, errors
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(fetch_and_store, url): url for url in pending}
+        for future in as_completed(futures):
+            url = futures[future]
+            try:
+                info = future.result()
+            except Exception as exc:
+                logger.warning("ingest: failed for %s: %s", url, exc)
+                errors[url] = str(exc)
+                continue
+            image, _ = IngestedImage.objects.get_or_create(source_url=url, defaults=info)
+            mapping[url] = image.url
+    return mapping, errors
+
+
+def ingest_post_images(queryset=None, workers=INGEST_WORKERS, dry_run=False):
+    """
+    Ingest external featured/OG images of posts and rewrite the posts.
+    Returns (posts rewritten, {source_url: error}).
+    """
+    queryset = Post.objects.all() if queryset is None else queryset
+    hosts = own_hosts()
+    rows = [row for row in queryset.values_list('id', *IMAGE_FIELDS)
+            if any(is_external(url, hosts) for url in row[1:])]
+    urls = {url for row in rows for url in row[1:] if is_external(url, hosts)}
+    if dry_run:
+        return len(rows), {}
+
+    mapping, errors = ingest_urls(urls, workers=workers)
+    rewritten = []
+    for post_id, *values in rows:
+        changes = {field: mapping[url] for field, url in zip(IMAGE_FIELDS, values) if url in mapping}
+        if changes:
+            # update() skips post_save (no revalidation/OG storm); caches are refreshed once below
+            Post.objects.filter(pk=post_id).update(**changes)
+            rewritten.append(post_id)
+    if rewritten:
+        bump_generation()
+        purge_keys([key for post_id in rewritten for key in post_keys(post_id)])
+    return len(rewritten), errors
@@ -0,0 +1,144 @@
+# backend/blog/links.py
+"""
+Outbound link health checks.
+
+sync_post_links() extracts <a href> targets from published post bodies into
+ExternalLink / PostLink. check_stale_links() re-checks only links whose last
+check is older than max_age, concurrently with httpx.AsyncClient:
+
+- at most `concurrency` requests in flight, and at most `per_host` per host,
+  so one slow site can't starve the run and no site gets hammered;
+- HEAD first; servers that reject HEAD (405/501/403, or a transport error)
+  get a streamed GET whose body is never downloaded.
+
+Database reads/writes happen outside the event loop.
+"""
+import asyncio
+import logging
+import re
+from collections import defaultdict
+from datetime import timedelta
+from html import unescape
+from urllib.parse import urldefrag, urlparse
+
+import httpx
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import Post, ExternalLink, PostLink
+
+logger = logging.getLogger(__name__)
+
+LINK_CHECK_MAX_AGE = timedelta(hours=getattr(settings, 'BLOG_LINK_CHECK_MAX_AGE_HOURS', 24 * 7))
+LINK_CHECK_CONCURRENCY = getattr(settings, 'BLOG_LINK_CHECK_CONCURRENCY', 20)
+LINK_CHECK_PER_HOST = getattr(settings, 'BLOG_LINK_CHECK_PER_HOST', 2)
+LINK_CHECK_TIMEOUT = getattr(settings, 'BLOG_LINK_CHECK_TIMEOUT', 10)
+LINK_CHECK_USER_AGENT = getattr(settings, 'BLOG_LINK_CHECK_USER_AGENT', 'PositiveThetaLinkChecker/1.0')
+# statuses meaning "this server doesn't like HEAD", not "the page is gone"
+HEAD_FALLBACK_STATUSES = {403, 405, 501}
+
+_HREF_RE = re.compile(r'<a\s[^>]*?href\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+
+
+def extract_links(content_html):
+    """Unique absolute http(s) link targets of a post body, without fragments."""
+    links = []
+    seen = set()
+    for _, href in _HREF_RE.findall(content_html or ''):
+        try:
+            url, _ = urldefrag(unescape(href.strip()))
+            parsed = urlparse(url)
+            if parsed.scheme not in ('http', 'https') or not parsed.hostname or len(url) > 2000:
+                continue
+        except ValueError:
+            # e.g. malformed IPv6 hosts ("http://[::1") or bad ports
+            continue
+        if url not in seen:
+            seen.add(url)
+            links.append(url)
+    return links
+
+
+def sync_post_links(posts=None):
+    """Refresh ExternalLink/PostLink from the bodies of published posts. Returns links found."""
+    # scheduled posts too: their links are checked before they go live
+    posts = Post.objects.published(scheduled=True) if posts is None else posts
+    wanted = {}
+    for post_id, content in posts.values_list('id', 'content').iterator(chunk_size=200):
+        wanted[post_id] = extract_links(content)
+
+    all_urls = {url for urls in wanted.values() for url in urls}
+    ExternalLink.objects.bulk_create([ExternalLink(url=url) for url in all_urls], ignore_conflicts=True)
+    link_ids = dict(ExternalLink.objects.filter(url__in=all_urls).values_list('url', 'id'))
+
+    existing = defaultdict(set)
+    for post_id, link_id in PostLink.objects.filter(post_id__in=wanted).values_list('post_id', 'link_id'):
+        existing[post_id].add(link_id)
+    to_create = []
+    for post_id, urls in wanted.items():
+        current = {link_ids[url] for url in urls}
+        gone = existing[post_id] - current
+        if gone:
+            PostLink.objects.filter(post_id=post_id, link_id__in=gone).delete()
+        to_create.extend(PostLink(post_id=post_id, link_id=link_id) for link_id in current - existing[post_id])
+    PostLink.objects.bulk_create(to_create, ignore_conflicts=True)
+    # links no post references any more
+    ExternalLink.objects.filter(post_links__isnull=True).delete()
+    return len(all_urls)
+
+
+async def _check_one(client, url, limit, host_limits):
+    try:
+        host = urlparse(url).hostname
+        async with limit, host_limits[host]:
+            try:
+                response = await client.head(url)
+                if response.status_code not in HEAD_FALLBACK_STATUSES:
+                    return url, response.status_code, str(response.url), ''
+            except httpx.HTTPError:
+                pass  # retried with GET below
+            async with client.stream('GET', url) as response:
+                return url, response.status_code, str(response.url), ''
+    except Exception as exc:
+        # anything (httpx errors, invalid URLs, bad redirects) fails this url only, not the run
+        return url, None, '', (f"{type(exc).__name__}: {exc}")[:255]
+
+
+async def check_urls(urls, concurrency=LINK_CHECK_CONCURRENCY, per_host=LINK_CHECK_PER_HOST,
+                     timeout=LINK_CHECK_TIMEOUT):
+    """[(url, status_code or None, final_url, error)] for every url."""
+    limit = asyncio.Semaphore(max(1, concurrency))
+    host_limits = defaultdict(lambda: asyncio.Semaphore(max(1, per_host)))
+    async with httpx.AsyncClient(follow_redirects=True, timeout=timeout,
+                                 headers={'User-Agent': LINK_CHECK_USER_AGENT}) as client:
+        return await asyncio.gather(*(_check_one(client, url, limit, host_limits) for url in urls))
+
+
+def check_stale_links(max_age=LINK_CHECK_MAX_AGE, force=False, **options):
+    """Check links not checked within max_age (all with force). Returns the number checked."""
+    links = ExternalLink.objects.all()
+    if not force:
+        links = links.filter(Q(checked_at__isnull=True) | Q(checked_at__lt=timezone.now() - max_age))
+    links = {link.url: link for link in links.only('id', 'url')}
+    if not links:
+        return 0
+
+    results = asyncio.run(check_urls(list(links), **options))
+    now = timezone.now()
+    for url, status_code, final_url, error in results:
+        link = links[url]
+        link.status_code = status_code
+        link.is_ok = status_code is not None and 200 <= status_code < 400
+        link.final_url = final_url[:2000] if final_url != url else ''
+        link.error = error
+        link.checked_at = now
+    ExternalLink.objects.bulk_update(links.values(), ['status_code', 'is_ok', 'final_url', 'error', 'checked_at'],
+                                     batch_size=500)
+    return len(links)
+
+
+def broken_links():
+    """PostLink rows whose link failed its last check, with post and link loaded."""
+    return (PostLink.objects.filter(link__is_ok=False)
+            .select_related('post', 'link').order_by('post_id', 'link__url'))
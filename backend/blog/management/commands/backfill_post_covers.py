@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+from django.db.models import OuterRef, Subquery
+
+from blog.models import Post, PostAttachment
+
+
+class Command(BaseCommand):
+    help = "Fill Post.cover_attachment with each post's first attachment (single UPDATE)"
+
+    def handle(self, *args, **kwargs):
+        first_attachment = (PostAttachment.objects
+                            .filter(post_id=OuterRef('pk'))
+                            .order_by('id')
+                            .values('id')[:1])
+        updated = Post.objects.update(cover_attachment_id=Subquery(first_attachment))
+        self.stdout.write(self.style.SUCCESS(f"Cover attachments refreshed for {updated} posts."))
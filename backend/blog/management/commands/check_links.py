@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+
+from blog.links import (
+    LINK_CHECK_CONCURRENCY, LINK_CHECK_MAX_AGE, LINK_CHECK_PER_HOST, LINK_CHECK_TIMEOUT,
+    broken_links, check_stale_links, sync_post_links,
+)
+
+
+class Command(BaseCommand):
+    help = "Extract outbound links from published posts and check the stale ones concurrently"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--max-age-hours', type=float, default=LINK_CHECK_MAX_AGE.total_seconds() / 3600,
+                            help="Re-check links whose last check is older than this")
+        parser.add_argument('--all', action='store_true', help="Re-check every link regardless of age")
+        parser.add_argument('--concurrency', type=int, default=LINK_CHECK_CONCURRENCY)
+        parser.add_argument('--per-host', type=int, default=LINK_CHECK_PER_HOST)
+        parser.add_argument('--timeout', type=float, default=LINK_CHECK_TIMEOUT)
+
+    def handle(self, *args, **kwargs):
+        found = sync_post_links()
+        self.stdout.write(f"Outbound links in published posts: {found}")
+        checked = check_stale_links(
+            max_age=timedelta(hours=kwargs['max_age_hours']),
+            force=kwargs['all'],
+            concurrency=kwargs['concurrency'],
+            per_host=kwargs['per_host'],
+            timeout=kwargs['timeout'],
+        )
+        self.stdout.write(f"Checked: {checked}")
+        broken = list(broken_links())
+        for entry in broken:
+            reason = entry.link.status_code or entry.link.error
+            self.stdout.write(f"  [{entry.post.slug}] {entry.link.url} -> {reason}")
+        self.stdout.write(self.style.SUCCESS(f"Done. Broken links: {len(broken)}"))
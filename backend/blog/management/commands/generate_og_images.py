@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import Post
+from blog.og_images import ensure_og_image
+
+
+class Command(BaseCommand):
+    help = "Generate Open Graph cards for published posts whose title, category or cover changed"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--post', type=int, help="Only this post id")
+        parser.add_argument('--force', action='store_true', help="Re-render even when the inputs are unchanged")
+
+    def handle(self, *args, **kwargs):
+        # scheduled posts too, so the card is ready when they go live
+        posts = Post.objects.published(scheduled=True)
+        if kwargs.get('post'):
+            posts = posts.filter(pk=kwargs['post'])
+        generated = failed = 0
+        for post_id in posts.order_by('id').values_list('id', flat=True).iterator():
+            try:
+                if ensure_og_image(post_id, force=kwargs['force']):
+                    generated += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Post {post_id}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Done. Cards generated: {generated}, failed: {failed}"))
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog.ingest import INGEST_WORKERS, ingest_post_images
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Copy external featured/OG images of posts into storage (resized, re-encoded) and rewrite their URLs"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=INGEST_WORKERS, help="Concurrent downloads")
+        parser.add_argument('--post', type=int, help="Only this post id")
+        parser.add_argument('--dry-run', action='store_true', help="Only count posts with external images")
+
+    def handle(self, *args, **kwargs):
+        posts = Post.objects.all()
+        if kwargs.get('post'):
+            posts = posts.filter(pk=kwargs['post'])
+        count, errors = ingest_post_images(posts, workers=kwargs['workers'], dry_run=kwargs['dry_run'])
+        if kwargs['dry_run']:
+            self.stdout.write(f"Posts with external images: {count}")
+            return
+        for url, error in errors.items():
+            self.stderr.write(f"{url}: {error}")
+        self.stdout.write(self.style.SUCCESS(f"Done. Posts rewritten: {count}, failed images: {len(errors)}"))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from blog import html_pipeline
+from blog.cache import bump_generation
+from blog.html_pipeline import render_content
+from blog.models import Post
+from blog.purge import post_keys, purge_keys
+
+
+class Command(BaseCommand):
+    help = "Re-render post bodies, reading missing image sizes from our own media hosts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--post', type=int, help="Only this post id")
+
+    def handle(self, *args, **kwargs):
+        if not html_pipeline.IMAGE_PROBE_ENABLED:
+            raise CommandError("Image probing is off (set BLOG_HTML_IMAGE_PROBE = True)")
+        posts = Post.objects.exclude(content='')
+        if kwargs.get('post'):
+            posts = posts.filter(pk=kwargs['post'])
+        updated_ids = []
+        failed = 0
+        for post in posts.order_by('id').only('id', 'content', 'content_html').iterator(chunk_size=100):
+            try:
+                content_html, toc = render_content(post.content, probe_images=True)
+                if content_html != post.content_html:
+                    # update(): no post_save receivers (revalidation, purges, OG cards) per post
+                    Post.objects.filter(pk=post.pk).update(content_html=content_html, toc=toc)
+                    updated_ids.append(post.pk)
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Post {post.pk}: {exc}")
+        if updated_ids:
+            # the API cache and edge copies of the rewritten posts, refreshed once
+            bump_generation()
+            purge_keys([key for post_id in updated_ids for key in post_keys(post_id)])
+        self.stdout.write(self.style.SUCCESS(f"Done. Posts updated: {len(updated_ids)}, failed: {failed}"))
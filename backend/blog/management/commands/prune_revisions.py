@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from blog.models import PostRevision
+from blog.revisions import REVISION_AUTOSAVE_RETENTION_DAYS, prune_revisions
+
+
+class Command(BaseCommand):
+    help = "Delete old autosave revisions, re-encoding the remaining revision chains"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=float, default=REVISION_AUTOSAVE_RETENTION_DAYS,
+                            help="Keep autosaves written within this many days")
+
+    def handle(self, *args, **kwargs):
+        deleted = prune_revisions(retention_days=kwargs['days'])
+        remaining = PostRevision.objects.count()
+        self.stdout.write(self.style.SUCCESS(f"Done. Deleted: {deleted}, remaining revisions: {remaining}"))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from blog.scheduling import publish_due_posts, seconds_until_next_publish
+
+
+class Command(BaseCommand):
+    help = "Invalidate caches and trigger revalidation for scheduled posts whose publish time has come"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true',
+                            help="Keep running, waking up at the next scheduled publish time")
+        parser.add_argument('--max-sleep', type=int, default=60,
+                            help="Upper bound for one sleep in --loop mode (seconds); also picks up new schedules")
+
+    def handle(self, *args, **kwargs):
+        while True:
+            published = publish_due_posts()
+            if published:
+                self.stdout.write(self.style.SUCCESS(f"Published scheduled posts: {published}"))
+            if not kwargs['loop']:
+                return
+            seconds = seconds_until_next_publish()
+            sleep_for = kwargs['max_sleep'] if seconds is None else min(kwargs['max_sleep'], seconds + 1)
+            time.sleep(max(1, sleep_for))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from blog.archive import rebuild_archive
+
+
+class Command(BaseCommand):
+    help = "Recount the per-month archive histogram of published posts"
+
+    def handle(self, *args, **kwargs):
+        months = rebuild_archive()
+        self.stdout.write(self.style.SUCCESS(f"Done. Months with posts: {months}"))
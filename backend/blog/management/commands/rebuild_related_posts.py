@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from blog.related import rebuild_all_related, RELATED_POSTS_LIMIT
+
+
+class Command(BaseCommand):
+    help = "Rebuild the precomputed related-posts index for all published posts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=RELATED_POSTS_LIMIT,
+                            help="How many related posts to keep per post")
+
+    def handle(self, *args, **kwargs):
+        self.stdout.write("Rebuilding related posts...")
+        processed = rebuild_all_related(limit=kwargs['limit'])
+        self.stdout.write(self.style.SUCCESS(f"Done. Posts indexed: {processed}"))
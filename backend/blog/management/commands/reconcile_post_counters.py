@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from blog.counters import reconcile_post_counters
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = "Recompute Post comments/likes/views counters from source tables and repair drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--post', type=int, action='append', dest='post_ids',
+                            help="Only reconcile the given post id (repeatable)")
+
+    def handle(self, *args, **kwargs):
+        queryset = Post.objects.all()
+        if kwargs.get('post_ids'):
+            queryset = queryset.filter(pk__in=kwargs['post_ids'])
+        self.stdout.write("Reconciling post counters...")
+        drifted = reconcile_post_counters(queryset)
+        self.stdout.write(self.style.SUCCESS(f"Done. Posts repaired: {drifted}"))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:47
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0003_remove_postrevision_data'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='cover_attachment',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.postattachment', verbose_name='Обложка (вложение)'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:48
+
+from django.db import migrations, models
+
+from blog.counters import actual_counter_expressions
+
+
+def fill_counters(apps, schema_editor):
+    # same subqueries as reconcile_post_counters, over the historical models
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.update(**actual_counter_expressions(apps))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0004_post_cover_attachment'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='comments_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Комментариев'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Лайков'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='views_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Просмотров'),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:49
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def fill_comment_paths(apps, schema_editor):
+    """
+    Compute materialized paths for existing comments. Parents are resolved
+    before children regardless of id order; orphans are treated as roots.
+    """
+    Comment = apps.get_model('blog', 'Comment')
+    parents = dict(Comment.objects.values_list('id', 'parent_id'))
+    paths = {}
+
+    def path_for(pk, seen=()):
+        if pk in paths:
+            return paths[pk]
+        parent_id = parents.get(pk)
+        prefix = ''
+        if parent_id in parents and parent_id not in seen:
+            prefix = path_for(parent_id, seen + (pk,))
+        paths[pk] = f"{prefix}{pk:010d}/"
+        return paths[pk]
+
+    for pk in parents:
+        path_for(pk)
+    for pk, path in paths.items():
+        Comment.objects.filter(pk=pk).update(path=path)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0005_post_engagement_counters'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, default='', editable=False, max_length=600, verbose_name='Путь в ветке'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', 'path'], name='blog_commen_post_id_34d25d_idx'),
+        ),
+        migrations.RunPython(fill_comment_paths, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:50
+
+from django.db import migrations, models
+
+from blog.utils import text_metrics
+
+
+def fill_text_metrics(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.only('id', 'content').iterator(chunk_size=200):
+        Post.objects.filter(pk=post.pk).update(**text_metrics(post.content or ''))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0006_comment_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='auto_excerpt',
+            field=models.CharField(blank=True, default='', editable=False, max_length=255, verbose_name='Автоописание'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='plain_text',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='Текст без разметки'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='reading_minutes',
+            field=models.PositiveSmallIntegerField(default=1, editable=False, verbose_name='Время чтения (мин)'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='word_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Слов'),
+        ),
+        migrations.RunPython(fill_text_metrics, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.5 on 2026-10-18 22:57
+
+from django.db import migrations, models
+
+from blog.html_pipeline import render_content
+
+
+def fill_rendered_content(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    for post in Post.objects.only('id', 'content').iterator(chunk_size=200):
+        # no network during migrations: width/height come from manage.py probe_image_dimensions
+        content_html, toc = render_content(post.content or '', probe_images=False)
+        Post.objects.filter(pk=post.pk).update(content_html=content_html, toc=toc)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0008_related_post'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='content_html',
+            field=models.TextField(blank=True, default='', editable=False, verbose_name='HTML для показа'),
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='toc',
+            field=models.JSONField(blank=True, default=list, editable=False, verbose_name='Оглавление'),
+        ),
+        migrations.RunPython(fill_rendered_content, reverse_code=migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0010_title_trigram_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='og_image_hash',
+            field=models.CharField(blank=True, default='', editable=False, max_length=40, verbose_name='Хеш OG-карточки'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0011_post_og_image_hash'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestedImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_url', models.URLField(max_length=2000, unique=True, verbose_name='Исходный URL')),
+                ('content_hash', models.CharField(db_index=True, max_length=64, verbose_name='SHA-256 оригинала')),
+                ('stored_name', models.CharField(max_length=500, verbose_name='Файл в хранилище')),
+                ('url', models.URLField(max_length=1000, verbose_name='URL в хранилище')),
+                ('width', models.PositiveIntegerField(default=0)),
+                ('height', models.PositiveIntegerField(default=0)),
+                ('size_bytes', models.PositiveIntegerField(default=0, verbose_name='Размер (байт)')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Загруженное изображение',
+                'verbose_name_plural': 'Загруженные изображения',
+            },
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:07
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0012_ingested_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExternalLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('url', models.URLField(max_length=2000, unique=True)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True, verbose_name='HTTP статус')),
+                ('is_ok', models.BooleanField(null=True, verbose_name='Доступна')),
+                ('final_url', models.URLField(blank=True, default='', max_length=2000, verbose_name='URL после редиректов')),
+                ('error', models.CharField(blank=True, default='', max_length=255, verbose_name='Ошибка')),
+                ('checked_at', models.DateTimeField(blank=True, db_index=True, null=True, verbose_name='Проверена')),
+            ],
+            options={
+                'verbose_name': 'Внешняя ссылка',
+                'verbose_name_plural': 'Внешние ссылки',
+            },
+        ),
+        migrations.CreateModel(
+            name='PostLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('link', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='blog.externallink')),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='post_links', to='blog.post')),
+            ],
+            options={
+                'unique_together': {('post', 'link')},
+            },
+        ),
+        migrations.AddField(
+            model_name='externallink',
+            name='posts',
+            field=models.ManyToManyField(related_name='external_links', through='blog.PostLink', to='blog.post'),
+        ),
+    ]
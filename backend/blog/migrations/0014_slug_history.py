@@ -0,0 +1,27 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:08
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0013_external_links'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlugHistory',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('slug', models.SlugField(max_length=300, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('post', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slug_history', to='blog.post')),
+            ],
+            options={
+                'verbose_name': 'Старый URL поста',
+                'verbose_name_plural': 'Старые URL постов',
+            },
+        ),
+    ]
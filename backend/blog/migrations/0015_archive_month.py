@@ -0,0 +1,44 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:11
+
+from collections import Counter
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def fill_archive(apps, schema_editor):
+    Post = apps.get_model('blog', 'Post')
+    ArchiveMonth = apps.get_model('blog', 'ArchiveMonth')
+    counts = Counter()
+    published = Post.objects.filter(status='published', published_at__isnull=False)
+    for published_at in published.values_list('published_at', flat=True).iterator(chunk_size=500):
+        local = timezone.localtime(published_at)
+        counts[(local.year, local.month)] += 1
+    ArchiveMonth.objects.bulk_create(
+        [ArchiveMonth(year=y, month=m, post_count=n) for (y, m), n in counts.items()])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0014_slug_history'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchiveMonth',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('year', models.PositiveSmallIntegerField()),
+                ('month', models.PositiveSmallIntegerField()),
+                ('post_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Месяц архива',
+                'verbose_name_plural': 'Архив по месяцам',
+                'ordering': ['-year', '-month'],
+                'unique_together': {('year', 'month')},
+            },
+        ),
+        migrations.RunPython(fill_archive, reverse_code=migrations.RunPython.noop),
+    ]
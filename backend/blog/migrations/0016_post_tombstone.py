@@ -0,0 +1,26 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0015_archive_month'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('post_id', models.BigIntegerField(db_index=True)),
+                ('slug', models.SlugField(max_length=300)),
+                ('deleted_at', models.DateTimeField(auto_now_add=True, db_index=True)),
+            ],
+            options={
+                'verbose_name': 'Удаленный пост',
+                'verbose_name_plural': 'Удаленные посты',
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.2.5 on 2026-10-18 23:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0016_post_tombstone'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='postrevision',
+            name='autosave',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='postrevision',
+            name='content_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='postrevision',
+            name='data',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.AddField(
+            model_name='postrevision',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='postrevision',
+            name='excerpt',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='postrevision',
+            name='is_keyframe',
+            field=models.BooleanField(default=True),
+        ),
+        migrations.AddField(
+            model_name='postrevision',
+            name='parent',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='blog.postrevision'),
+        ),
+        migrations.AddField(
+            model_name='postrevision',
+            name='title',
+            field=models.CharField(blank=True, default='', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='postrevision',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddIndex(
+            model_name='postrevision',
+            index=models.Index(fields=['post', '-id'], name='blog_postre_post_id_1b16dc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='postrevision',
+            index=models.Index(fields=['autosave', 'updated_at'], name='blog_postre_autosav_d3ef0a_idx'),
+        ),
+    ]
@@ -1,13 +1,43 @@
 # backend/blog/models.py
-from django.db import models
+from django.db import models, transaction, IntegrityError
+from django.db.models import Q, Value
+from django.db.models.functions import Concat, Substr
 from django.conf import settings
-from django.utils.text import slugify
+from django.contrib.postgres.indexes import GinIndex
 from django.urls import reverse
 from django.utils import timezone
 from django_summernote.models import AbstractAttachment
 
+from .html_pipeline import render_content
+from .utils import allocate_slug, text_metrics
 
-class Category(models.Model):
+
+class SlugAllocationMixin:
+    """
+    Fill an empty `slug` on save via blog.utils.allocate_slug (one prefix query,
+    Cyrillic transliterated). If a concurrent writer takes the same slug first,
+    the unique constraint fails and the slug is re-allocated (a few attempts).
+    """
+    slug_fallback = 'item'
+    slug_save_attempts = 3
+
+    def slug_source(self):
+        return getattr(self, 'title', '') or ''
+
+    def save(self, *args, **kwargs):
+        if getattr(self, 'slug', None):
+            return super().save(*args, **kwargs)
+        for attempt in range(self.slug_save_attempts):
+            self.slug = allocate_slug(type(self), self.slug_source(), exclude_pk=self.pk, fallback=self.slug_fallback)
+            try:
+                with transaction.atomic():
+                    return super().save(*args, **kwargs)
+            except IntegrityError:
+                if attempt == self.slug_save_attempts - 1:
+                    raise
+
+
+class Category(SlugAllocationMixin, models.Model):
     title = models.CharField(max_length=120, unique=True)
     slug = models.SlugField(max_length=140, unique=True, blank=True)
     description = models.TextField(blank=True)
@@ -17,16 +47,7 @@ class Category(models.Model):
         ordering = ['title']
         verbose_name_plural = "Categories"
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.title)[:120]
-            slug = base
-            counter = 1
-            while Category.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+    slug_fallback = 'category'
 
     def __str__(self):
         return self.title
@@ -35,23 +56,18 @@ class Category(models.Model):
         return reverse('blog:category-detail', kwargs={'slug': self.slug})
 
 
-class Tag(models.Model):
+class Tag(SlugAllocationMixin, models.Model):
     title = models.CharField(max_length=80, unique=True)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
 
     class Meta:
         ordering = ['title']
+        indexes = [
+            # pg_trgm index for /api/blog/autocomplete/ (blog/autocomplete.py)
+            GinIndex(fields=['title'], name='blog_tag_title_trgm', opclasses=['gin_trgm_ops']),
+        ]
 
-    def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.title)[:96]
-            slug = base
-            counter = 1
-            while Tag.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+    slug_fallback = 'tag'
 
     def __str__(self):
         return self.title
@@ -75,7 +91,29 @@ class PostAttachment(AbstractAttachment):
         verbose_name_plural = "Вложения"
 
 
-class Post(models.Model):
+def published_q(now=None, prefix='', scheduled=False):
+    """
+    The published-post condition, for Post (prefix='') or across a relation
+    (prefix='posts__'). scheduled=True also keeps posts whose published_at is
+    still ahead (published, just not visible yet).
+    """
+    q = Q(**{f'{prefix}status': 'published', f'{prefix}published_at__isnull': False})
+    if not scheduled:
+        q &= Q(**{f'{prefix}published_at__lte': now or timezone.now()})
+    return q
+
+
+class PostQuerySet(models.QuerySet):
+    def published(self, now=None, scheduled=False):
+        """Publicly visible posts: published, and not scheduled after `now` (unless scheduled=True)."""
+        return self.filter(published_q(now, scheduled=scheduled))
+
+    def unpublished(self, now=None):
+        """Everything published() leaves out: drafts, archived and scheduled posts."""
+        return self.exclude(published_q(now))
+
+
+class Post(SlugAllocationMixin, models.Model):
     STATUS_CHOICES = (
         ('draft', 'Черновик'),
         ('published', 'Опубликован'),
@@ -97,11 +135,44 @@ class Post(models.Model):
     categories = models.ManyToManyField(Category, related_name='posts', blank=True, verbose_name="Категории")
     tags = models.ManyToManyField(Tag, related_name='posts', blank=True, verbose_name="Теги")
     content_json = models.TextField(blank=True, null=True, verbose_name="Content JSON")
+    # Denormalized cover: first attachment of the post, used when featured_image is empty.
+    # Kept current by blog/signals.py, backfilled by `manage.py backfill_post_covers`.
+    cover_attachment = models.ForeignKey(
+        'PostAttachment',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='+',
+        verbose_name="Обложка (вложение)"
+    )
 
     # SEO / metadata
     meta_title = models.CharField(max_length=255, blank=True, verbose_name="Мета-заголовок")
     meta_description = models.CharField(max_length=320, blank=True, verbose_name="Мета-описание")
     og_image = models.URLField(blank=True, verbose_name="Open Graph изображение")
+    # hash of the inputs of a generated card (blog/og_images.py); empty when og_image was set by hand
+    og_image_hash = models.CharField(max_length=40, blank=True, default='', editable=False, verbose_name="Хеш OG-карточки")
+
+    # Derived from `content` on save (see Post.refresh_text_metrics) so list
+    # queries can defer the heavy body columns.
+    plain_text = models.TextField(blank=True, default='', editable=False, verbose_name="Текст без разметки")
+    word_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Слов")
+    reading_minutes = models.PositiveSmallIntegerField(default=1, editable=False, verbose_name="Время чтения (мин)")
+    auto_excerpt = models.CharField(max_length=255, blank=True, default='', editable=False, verbose_name="Автоописание")
+    TEXT_METRIC_FIELDS = {'plain_text', 'word_count', 'reading_minutes', 'auto_excerpt'}
+
+    # Sanitized/enriched body and table of contents (blog/html_pipeline.py),
+    # rendered on save and served by the detail endpoint instead of `content`.
+    content_html = models.TextField(blank=True, default='', editable=False, verbose_name="HTML для показа")
+    toc = models.JSONField(blank=True, default=list, editable=False, verbose_name="Оглавление")
+    RENDERED_CONTENT_FIELDS = {'content_html', 'toc'}
+
+    # Denormalized engagement counters, updated with F() by blog/counters.py
+    # and repaired by `manage.py reconcile_post_counters`.
+    comments_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Комментариев")
+    likes_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Лайков")
+    views_count = models.PositiveIntegerField(default=0, editable=False, verbose_name="Просмотров")
 
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft', db_index=True, verbose_name="Статус")
     published_at = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Дата публикации")
@@ -109,32 +180,49 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создан")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Обновлен")
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ['-published_at']
         indexes = [
             models.Index(fields=['slug']),
             models.Index(fields=['status', 'published_at']),
+            # pg_trgm index for /api/blog/autocomplete/ (blog/autocomplete.py)
+            GinIndex(fields=['title'], name='blog_post_title_trgm', opclasses=['gin_trgm_ops']),
         ]
         verbose_name = "Пост"
         verbose_name_plural = "Посты"
 
-    def save(self, *args, **kwargs):
-        # Auto-generate slug if missing
-        if not self.slug:
-            base = slugify(self.title)[:250]
-            slug = base
-            counter = 1
-            while Post.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{counter}"
-                counter += 1
-            self.slug = slug
+    slug_fallback = 'post'
+
+    def slug_source(self):
+        # empty slug is allocated by SlugAllocationMixin on save
+        return self.title or self.meta_title or self.excerpt or ''
 
+    def save(self, *args, **kwargs):
+        update_fields = kwargs.get('update_fields')
         # If meta_title missing, default to title
         if not self.meta_title:
             self.meta_title = self.title
+            if update_fields is not None:
+                kwargs['update_fields'] = update_fields = set(update_fields) | {'meta_title'}
+
+        # Recompute derived text fields when content is part of this save
+        if 'content' not in self.get_deferred_fields() and (update_fields is None or 'content' in update_fields):
+            self.refresh_text_metrics()
+            self.refresh_rendered_content()
+            if update_fields is not None:
+                kwargs['update_fields'] = set(update_fields) | self.TEXT_METRIC_FIELDS | self.RENDERED_CONTENT_FIELDS
 
         super().save(*args, **kwargs)
 
+    def refresh_text_metrics(self):
+        for field, value in text_metrics(self.content or '').items():
+            setattr(self, field, value)
+
+    def refresh_rendered_content(self):
+        self.content_html, self.toc = render_content(self.content or '')
+
     def __str__(self):
         return f"{self.title} ({self.get_status_display()})"
 
@@ -147,18 +235,179 @@ class Post(models.Model):
 
     @property
     def reading_time(self):
-        word_count = len(self.content.split())
-        return max(1, round(word_count / 200))
+        # stored on save; unsaved instances fall back to computing it
+        if self.pk is None:
+            return text_metrics(self.content or '')['reading_minutes']
+        return self.reading_minutes
+
+def refresh_cover_attachment(post_id):
+    """
+    Point Post.cover_attachment at the post's first attachment (by id), or NULL.
+    Uses .update() so it neither fires post signals nor touches updated_at.
+    """
+    if not post_id:
+        return
+    first_id = (PostAttachment.objects.filter(post_id=post_id)
+                .order_by('id').values_list('id', flat=True).first())
+    Post.objects.filter(pk=post_id).update(cover_attachment_id=first_id)
+
+
+class SlugHistory(models.Model):
+    """
+    A slug a post used to have; requests for it are redirected (301) to the
+    current slug (see blog/slugs.py). Recorded by blog/signals.py on slug change.
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='slug_history')
+    slug = models.SlugField(max_length=300, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Старый URL поста"
+        verbose_name_plural = "Старые URL постов"
+
+    def __str__(self):
+        return f"{self.slug} -> {self.post_id}"
+
+
+class PostTombstone(models.Model):
+    """
+    A deleted post, so incremental exports (blog/export.py) can tell static
+    builds to drop its page. Recorded by blog/signals.py.
+    """
+    post_id = models.BigIntegerField(db_index=True)
+    slug = models.SlugField(max_length=300)
+    deleted_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Удаленный пост"
+        verbose_name_plural = "Удаленные посты"
+
+    def __str__(self):
+        return f"{self.slug} ({self.post_id})"
+
+
+class ArchiveMonth(models.Model):
+    """
+    Published posts per month of published_at (site time zone), maintained by
+    blog/signals.py; see blog/archive.py.
+    """
+    year = models.PositiveSmallIntegerField()
+    month = models.PositiveSmallIntegerField()
+    post_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-year', '-month']
+        unique_together = ('year', 'month')
+        verbose_name = "Месяц архива"
+        verbose_name_plural = "Архив по месяцам"
+
+    def __str__(self):
+        return f"{self.year}-{self.month:02d} ({self.post_count})"
+
+
+class RelatedPost(models.Model):
+    """
+    Precomputed top-K "related posts" of a post (see blog/related.py).
+    """
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='related_entries')
+    related = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField(default=0)
+    computed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-score']
+        unique_together = ('post', 'related')
+        indexes = [
+            models.Index(fields=['post', '-score']),
+        ]
+        verbose_name = "Похожий пост"
+        verbose_name_plural = "Похожие посты"
+
+    def __str__(self):
+        return f"{self.post_id} -> {self.related_id} ({self.score:.2f})"
+
+
+class IngestedImage(models.Model):
+    """
+    An external image copied into our storage, resized and re-encoded (see blog/ingest.py).
+    Several source URLs with identical bytes share one stored file.
+    """
+    source_url = models.URLField(max_length=2000, unique=True, verbose_name="Исходный URL")
+    content_hash = models.CharField(max_length=64, db_index=True, verbose_name="SHA-256 оригинала")
+    stored_name = models.CharField(max_length=500, verbose_name="Файл в хранилище")
+    url = models.URLField(max_length=1000, verbose_name="URL в хранилище")
+    width = models.PositiveIntegerField(default=0)
+    height = models.PositiveIntegerField(default=0)
+    size_bytes = models.PositiveIntegerField(default=0, verbose_name="Размер (байт)")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Загруженное изображение"
+        verbose_name_plural = "Загруженные изображения"
+
+    def __str__(self):
+        return self.source_url
+
+
+class ExternalLink(models.Model):
+    """
+    An outbound link found in post content with the result of its last check
+    (see blog/links.py and `manage.py check_links`).
+    """
+    url = models.URLField(max_length=2000, unique=True)
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True, verbose_name="HTTP статус")
+    is_ok = models.BooleanField(null=True, verbose_name="Доступна")
+    final_url = models.URLField(max_length=2000, blank=True, default='', verbose_name="URL после редиректов")
+    error = models.CharField(max_length=255, blank=True, default='', verbose_name="Ошибка")
+    checked_at = models.DateTimeField(null=True, blank=True, db_index=True, verbose_name="Проверена")
+    posts = models.ManyToManyField(Post, through='PostLink', related_name='external_links')
+
+    class Meta:
+        verbose_name = "Внешняя ссылка"
+        verbose_name_plural = "Внешние ссылки"
+
+    def __str__(self):
+        return self.url
+
+
+class PostLink(models.Model):
+    post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name='post_links')
+    link = models.ForeignKey(ExternalLink, on_delete=models.CASCADE, related_name='post_links')
+
+    class Meta:
+        unique_together = ('post', 'link')
+
 
 class PostRevision(models.Model):
+    """
+    A snapshot of a post's title/excerpt/content. Content is stored compressed,
+    either whole (keyframe) or as a diff against `parent`; see blog/revisions.py
+    for encoding, autosave coalescing and pruning. Use revision_content() to read it.
+    """
     post = models.ForeignKey('Post', on_delete=models.CASCADE, related_name='revisions')
     created_at = models.DateTimeField(auto_now_add=True)
+    # coalesced autosaves keep their created_at and move updated_at
+    updated_at = models.DateTimeField(auto_now=True)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, null=True, blank=True, on_delete=models.SET_NULL)
     meta = models.JSONField(blank=True, null=True)   # можно хранить snapshot в json
     note = models.TextField(blank=True)
+    title = models.CharField(max_length=255, blank=True, default='')
+    excerpt = models.TextField(blank=True, default='')
+    autosave = models.BooleanField(default=False)
+    # revisions are re-encoded (blog/revisions.py) before a parent is deleted
+    parent = models.ForeignKey('self', null=True, blank=True, on_delete=models.SET_NULL, related_name='+')
+    is_keyframe = models.BooleanField(default=True)
+    # deltas since the last keyframe (0 for keyframes)
+    depth = models.PositiveSmallIntegerField(default=0)
+    data = models.BinaryField(default=b'')
+    content_hash = models.CharField(max_length=64, blank=True, default='')
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['post', '-id']),
+            models.Index(fields=['autosave', 'updated_at']),
+        ]
         verbose_name = 'Ревизия поста'
         verbose_name_plural = 'Ревизии постов'
 
@@ -176,15 +425,57 @@ class Comment(models.Model):
     is_public = models.BooleanField(default=True, db_index=True, verbose_name="Публичный")
     is_moderated = models.BooleanField(default=False, verbose_name="Промодерирован")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Создан")
+    # Materialized path of zero-padded ids ("0000000012/0000000045/"): ordering by
+    # (post, path) yields whole threads depth-first in one indexed query.
+    path = models.CharField(max_length=600, blank=True, default='', editable=False, verbose_name="Путь в ветке")
+
+    PATH_SEGMENT_WIDTH = 10
 
     class Meta:
         ordering = ['created_at']
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(fields=['post', 'path']),
+        ]
 
     def __str__(self):
         return f"Комментарий к {self.post.title} от {self.name[:20]}"
 
+    @classmethod
+    def path_segment(cls, pk):
+        return f"{pk:0{cls.PATH_SEGMENT_WIDTH}d}/"
+
+    def _path_is_current(self):
+        segments = self.path.rstrip('/').split('/') if self.path else []
+        if not segments or segments[-1] + '/' != self.path_segment(self.pk):
+            return False
+        if self.parent_id is None:
+            return len(segments) == 1
+        return len(segments) >= 2 and segments[-2] + '/' == self.path_segment(self.parent_id)
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if not self._path_is_current():
+            self._rebuild_path()
+
+    def _rebuild_path(self):
+        """
+        Set this comment's path from its parent and move its subtree along (parent changed).
+        """
+        parent_path = ''
+        if self.parent_id:
+            parent_path = Comment.objects.filter(pk=self.parent_id).values_list('path', flat=True).first() or ''
+        new_path = parent_path + self.path_segment(self.pk)
+        old_path = self.path
+        Comment.objects.filter(pk=self.pk).update(path=new_path)
+        if old_path:
+            (Comment.objects
+             .filter(post_id=self.post_id, path__startswith=old_path)
+             .exclude(pk=self.pk)
+             .update(path=Concat(Value(new_path), Substr('path', len(old_path) + 1))))
+        self.path = new_path
+
 
 class PostReaction(models.Model):
     post = models.ForeignKey(
@@ -0,0 +1,224 @@
+# backend/blog/og_images.py
+"""
+Pre-generated Open Graph cards (1200x630) for published posts.
+
+The card shows the cover (featured_image or the cover attachment) darkened
+behind the category label and the title. It is rendered once, saved through
+default_storage and its URL written to Post.og_image. Post.og_image_hash
+holds the hash of the inputs (title, category, cover, layout version):
+
+- an unchanged hash means nothing to do, so re-saving a post is cheap;
+- a non-empty hash also marks og_image as generated — an og_image set by hand
+  (hash empty) is never overwritten.
+
+Generation is queued after commit when a published post is saved
+(blog/signals.py) and runs on a small background thread pool
+(schedule_og_image), so downloading the cover and rendering never hold up
+the request; in bulk it runs via `manage.py generate_og_images`.
+"""
+import hashlib
+import io
+import logging
+import textwrap
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+
+from .cache import bump_generation
+from .models import Post
+from .purge import post_keys, purge_keys
+
+logger = logging.getLogger(__name__)
+
+OG_SIZE = (1200, 630)
+OG_LAYOUT_VERSION = 1  # bump to regenerate every card after a design change
+OG_STORAGE_DIR = getattr(settings, 'BLOG_OG_STORAGE_DIR', 'og')
+OG_SITE_NAME = getattr(settings, 'BLOG_OG_SITE_NAME', 'Positive Theta')
+OG_FONT_PATH = getattr(settings, 'BLOG_OG_FONT_PATH', '/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf')
+OG_COVER_TIMEOUT = getattr(settings, 'BLOG_OG_COVER_TIMEOUT', 5)
+OG_COVER_MAX_BYTES = 10 * 1024 * 1024
+OG_WORKERS = getattr(settings, 'BLOG_OG_WORKERS', 2)
+OG_BACKGROUND = (17, 24, 39)
+OG_ACCENT = (99, 102, 241)
+
+
+def _font(size):
+    try:
+        return ImageFont.truetype(OG_FONT_PATH, size)
+    except Exception:
+        # Pillow's bundled font; Cyrillic coverage depends on the Pillow build
+        return ImageFont.load_default(size=size)
+
+
+def _cover_url(post):
+    if post.featured_image:
+        return post.featured_image
+    cover = post.cover_attachment
+    if cover is not None and getattr(cover, 'file', None):
+        try:
+            return cover.file.url
+        except Exception:
+            return getattr(cover.file, 'name', '') or ''
+    return ''
+
+
+def _category_title(post):
+    category = post.categories.order_by('title').first()
+    return category.title if category else ''
+
+
+def og_hash(title, category, cover_url):
+    raw = f"{OG_LAYOUT_VERSION}|{title}|{category}|{cover_url}"
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+
+def _load_cover(cover_url):
+    if not cover_url:
+        return None
+    try:
+        if cover_url.startswith(('http://', 'https://')):
+            # closing the streamed response hands the connection back to the pool
+            with requests.get(cover_url, timeout=OG_COVER_TIMEOUT, stream=True) as resp:
+                if resp.status_code != 200:
+                    return None
+                data = resp.raw.read(OG_COVER_MAX_BYTES + 1, decode_content=True)
+            if len(data) > OG_COVER_MAX_BYTES:
+                return None
+        else:
+            with default_storage.open(cover_url) as fh:
+                data = fh.read()
+        return Image.open(io.BytesIO(data)).convert('RGB')
+    except Exception:
+        logger.warning("og image: could not load cover %s", cover_url, exc_info=True)
+        return None
+
+
+def render_card(title, category, cover=None):
+    """Return JPEG bytes of the card."""
+    width, height = OG_SIZE
+    if cover is not None:
+        card = ImageOps.fit(cover, OG_SIZE, Image.LANCZOS)
+        # darken so white text stays readable on any photo
+        card = Image.blend(card, Image.new('RGB', OG_SIZE, OG_BACKGROUND), 0.6)
+    else:
+        card = Image.new('RGB', OG_SIZE, OG_BACKGROUND)
+    draw = ImageDraw.Draw(card)
+    margin = 72
+
+    draw.rectangle([0, 0, width, 12], fill=OG_ACCENT)
+    if category:
+        label_font = _font(30)
+        label = category.upper()
+        left, top, right, bottom = draw.textbbox((0, 0), label, font=label_font)
+        draw.rounded_rectangle([margin, margin, margin + right - left + 40, margin + bottom - top + 28],
+                               radius=12, fill=OG_ACCENT)
+        draw.text((margin + 20, margin + 14 - top), label, font=label_font, fill='white')
+
+    # largest font size at which the title fits in four lines
+    for size, chars in ((72, 26), (60, 32), (50, 40), (42, 48)):
+        lines = textwrap.wrap(title, width=chars)
+        if len(lines) <= 4:
+            break
+    lines = lines[:4]
+    title_font = _font(size)
+    line_height = int(size * 1.2)
+    y = height - margin - 60 - line_height * len(lines)
+    for line in lines:
+        draw.text((margin, y), line, font=title_font, fill='white')
+        y += line_height
+
+    draw.text((margin, height - margin - 30), OG_SITE_NAME, font=_font(28), fill=(203, 213, 225))
+
+    buf = io.BytesIO()
+    card.save(buf, format='JPEG', quality=88, optimize=True)
+    return buf.getvalue()
+
+
+def _storage_name(post_id, digest):
+    return f"{OG_STORAGE_DIR}/post-{post_id}-{digest[:12]}.jpg"
+
+
+def ensure_og_image(post_id, force=False, instance=None):
+    """
+    Generate the card of a published post if its inputs changed.
+    Returns True when a new image was stored. `instance` (the saved Post, if
+    any) gets the new values too, so a later save() of it doesn't reset them.
+    """
+    post = (Post.objects.select_related('cover_attachment')
+            .only('id', 'title', 'status', 'featured_image', 'og_image', 'og_image_hash', 'cover_attachment__file')
+            .filter(pk=post_id).first())
+    if post is None or post.status != 'published':
+        return False
+    if post.og_image and not post.og_image_hash:
+        return False  # set by hand
+
+    category = _category_title(post)
+    cover_url = _cover_url(post)
+    digest = og_hash(post.title, category, cover_url)
+    if digest == post.og_image_hash and post.og_image and not force:
+        return False
+
+    body = render_card(post.title, category, _load_cover(cover_url))
+    target = _storage_name(post.pk, digest)
+    if force and default_storage.exists(target):
+        default_storage.delete(target)
+    name = default_storage.save(target, ContentFile(body))
+    url = default_storage.url(name)
+    # update() keeps this out of post_save, so it can't retrigger itself;
+    # the caches showing og_image are refreshed by hand instead
+    Post.objects.filter(pk=post.pk).update(og_image=url, og_image_hash=digest)
+    if instance is not None:
+        instance.og_image, instance.og_image_hash = url, digest
+    bump_generation()
+    purge_keys(post_keys(post.pk))
+
+    if post.og_image_hash and post.og_image_hash != digest:
+        try:
+            default_storage.delete(_storage_name(post.pk, post.og_image_hash))
+        except Exception:
+            logger.warning("og image: could not delete previous card of post id=%s", post.pk, exc_info=True)
+    return True
+
+
+# ---------------------------
+# Background generation
+# ---------------------------
+_executor = None
+_lock = threading.Lock()
+_queued = set()
+
+
+def _get_executor():
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=max(1, OG_WORKERS), thread_name_prefix='og-image')
+        return _executor
+
+
+def _generate(post_id, instance):
+    with _lock:
+        # a save after this point queues the post again and sees the new inputs
+        _queued.discard(post_id)
+    try:
+        ensure_og_image(post_id, instance=instance)
+    except Exception:
+        logger.exception("og image: generation failed for post id=%s", post_id)
+    finally:
+        # worker threads open their own connections; don't leave them to time out
+        connections.close_all()
+
+
+def schedule_og_image(instance):
+    """Queue ensure_og_image for a saved post; a post already waiting in the queue is not added twice."""
+    with _lock:
+        if instance.pk in _queued:
+            return None
+        _queued.add(instance.pk)
+    return _get_executor().submit(_generate, instance.pk, instance)
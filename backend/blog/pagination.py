@@ -0,0 +1,122 @@
+# backend/blog/pagination.py
+import base64
+import binascii
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class PostKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination over (published_at, id), newest first.
+
+    - never runs COUNT(*) and never uses OFFSET, so deep pages cost the same as the first one
+    - the WHERE/ORDER BY pair matches the (status, published_at) index on Post
+    - cursors are opaque urlsafe-base64 strings: "<direction>|<published_at iso>|<id>"
+    - any ?ordering= passed by the client is ignored in this mode (keyset needs a fixed order)
+    """
+    page_size = 10
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'REST_FRAMEWORK', {}).get('PAGE_SIZE') or self.page_size
+
+    # ----- cursor encoding -----
+    def encode_cursor(self, direction, obj):
+        raw = f"{direction}|{obj.published_at.isoformat()}|{obj.pk}"
+        return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+    def decode_cursor(self, value):
+        try:
+            padded = value + '=' * (-len(value) % 4)
+            raw = base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8')
+            direction, published_at, pk = raw.split('|', 2)
+            published_at = parse_datetime(published_at)
+            if direction not in ('n', 'p') or published_at is None:
+                raise ValueError(raw)
+            return direction, published_at, int(pk)
+        except (ValueError, TypeError, binascii.Error, UnicodeError):
+            raise NotFound(detail="Invalid cursor")
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    # ----- pagination -----
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size_value = self.get_page_size(request)
+        cursor = request.query_params.get(self.cursor_query_param)
+
+        direction, published_at, pk = ('n', None, None)
+        if cursor:
+            direction, published_at, pk = self.decode_cursor(cursor)
+
+        if direction == 'n':
+            qs = queryset.order_by('-published_at', '-id')
+            if published_at is not None:
+                qs = qs.filter(Q(published_at__lt=published_at) | Q(published_at=published_at, id__lt=pk))
+        else:
+            qs = queryset.order_by('published_at', 'id')
+            qs = qs.filter(Q(published_at__gt=published_at) | Q(published_at=published_at, id__gt=pk))
+
+        # fetch one extra row to know whether there is another page in this direction
+        rows = list(qs[:self.page_size_value + 1])
+        has_more = len(rows) > self.page_size_value
+        rows = rows[:self.page_size_value]
+        if direction == 'p':
+            rows.reverse()
+
+        self.has_next = has_more if direction == 'n' else True
+        self.has_previous = bool(cursor) if direction == 'n' else has_more
+        self.page = rows
+        return rows
+
+    def get_next_link(self):
+        if not (self.page and self.has_next):
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor('n', self.page[-1]))
+
+    def get_previous_link(self):
+        if not (self.page and self.has_previous):
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor('p', self.page[0]))
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'properties': {
+                'next': {'type': 'string', 'nullable': True},
+                'previous': {'type': 'string', 'nullable': True},
+                'results': schema,
+            },
+        }
+
+
+def wants_keyset_pagination(request):
+    """
+    Keyset mode is opt-in: either a cursor is passed or the client asks for it
+    explicitly with ?pagination=cursor (to fetch the first page).
+    """
+    params = getattr(request, 'query_params', None) or {}
+    return bool(params.get('cursor')) or params.get('pagination') == 'cursor'
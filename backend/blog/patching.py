@@ -0,0 +1,215 @@
+# backend/blog/patching.py
+"""
+Patch semantics for post updates from the editor.
+
+Instead of the whole body, a request may carry:
+
+- `content_patch`: splices against the stored `content`, as
+  [[offset, delete_count, insert_text], ...] sorted by offset, non-overlapping,
+  offsets in UTF-16 code units of the *stored* text (what JS string indices are);
+- `content_json_patch`: an RFC 6902 JSON Patch applied to the stored
+  `content_json` document;
+- `base_version`: the `version` the client last saw (Post.updated_at); a
+  mismatch means someone else saved in between and the update is refused (409).
+  Patches are offsets into a specific version, so they require it (400 without).
+
+resolve_patch() turns such a request into plain field values, so validation
+and saving stay the same; writers then save only fields whose value changed.
+"""
+import copy
+import json
+
+from django.utils.dateparse import parse_datetime
+
+PATCH_KEYS = ('base_version', 'content_patch', 'content_json_patch')
+
+
+class PatchError(ValueError):
+    """The patch does not apply to the stored document."""
+
+
+class VersionConflict(Exception):
+    def __init__(self, current):
+        super().__init__(f"post changed since base_version (now {current})")
+        self.current = current
+
+
+def post_version(post):
+    return post.updated_at.isoformat() if getattr(post, 'updated_at', None) else ''
+
+
+def check_base_version(post, base_version):
+    if base_version in (None, ''):
+        return
+    given = parse_datetime(str(base_version))
+    if given is None:
+        raise PatchError("base_version must be an ISO 8601 datetime")
+    if post.updated_at is None or given != post.updated_at:
+        raise VersionConflict(post_version(post))
+
+
+# ---------------------------
+# Text splices
+# ---------------------------
+def apply_text_patch(text, ops):
+    if not isinstance(ops, list):
+        raise PatchError("content_patch must be a list of [offset, delete_count, insert_text]")
+    units = (text or '').encode('utf-16-le')
+    size = len(units) // 2
+    out = []
+    pos = 0
+    for op in ops:
+        if not (isinstance(op, (list, tuple)) and len(op) == 3):
+            raise PatchError(f"bad content_patch op: {op!r}")
+        offset, delete, insert = op
+        if not (isinstance(offset, int) and isinstance(delete, int) and isinstance(insert, str)):
+            raise PatchError(f"bad content_patch op: {op!r}")
+        if offset < pos or delete < 0 or offset + delete > size:
+            raise PatchError(f"content_patch op out of order or out of range: {op!r}")
+        out.append(units[pos * 2:offset * 2])
+        out.append(insert.encode('utf-16-le'))
+        pos = offset + delete
+    out.append(units[pos * 2:])
+    try:
+        return b''.join(out).decode('utf-16-le')
+    except UnicodeDecodeError:
+        raise PatchError("content_patch splits a surrogate pair")
+
+
+# ---------------------------
+# JSON Patch (RFC 6902)
+# ---------------------------
+def _parse_pointer(pointer):
+    if not isinstance(pointer, str) or (pointer and not pointer.startswith('/')):
+        raise PatchError(f"bad JSON pointer: {pointer!r}")
+    return [part.replace('~1', '/').replace('~0', '~') for part in pointer.split('/')[1:]]
+
+
+def _index(container, token, allow_end=False):
+    if allow_end and token == '-':
+        return len(container)
+    if not token.isdigit() or (len(token) > 1 and token.startswith('0')):
+        raise PatchError(f"bad array index: {token!r}")
+    index = int(token)
+    if index > len(container) or (index == len(container) and not allow_end):
+        raise PatchError(f"array index out of range: {token}")
+    return index
+
+
+def _walk(doc, parts):
+    node = doc
+    for token in parts:
+        if isinstance(node, list):
+            node = node[_index(node, token)]
+        elif isinstance(node, dict):
+            if token not in node:
+                raise PatchError(f"path not found: {token!r}")
+            node = node[token]
+        else:
+            raise PatchError(f"cannot descend into {type(node).__name__}")
+    return node
+
+
+def _get(doc, pointer):
+    return _walk(doc, _parse_pointer(pointer))
+
+
+def _add(doc, pointer, value):
+    parts = _parse_pointer(pointer)
+    if not parts:
+        return value
+    parent, token = _walk(doc, parts[:-1]), parts[-1]
+    if isinstance(parent, list):
+        parent.insert(_index(parent, token, allow_end=True), value)
+    elif isinstance(parent, dict):
+        parent[token] = value
+    else:
+        raise PatchError(f"cannot add to {type(parent).__name__}")
+    return doc
+
+
+def _remove(doc, pointer):
+    parts = _parse_pointer(pointer)
+    if not parts:
+        raise PatchError("cannot remove the document root")
+    parent, token = _walk(doc, parts[:-1]), parts[-1]
+    if isinstance(parent, list):
+        return doc, parent.pop(_index(parent, token))
+    if isinstance(parent, dict) and token in parent:
+        return doc, parent.pop(token)
+    raise PatchError(f"path not found: {pointer!r}")
+
+
+def apply_json_patch(doc, ops):
+    if not isinstance(ops, list):
+        raise PatchError("content_json_patch must be a list of operations")
+    doc = copy.deepcopy(doc)
+    for op in ops:
+        if not isinstance(op, dict) or 'op' not in op or 'path' not in op:
+            raise PatchError(f"bad JSON Patch op: {op!r}")
+        kind, path = op['op'], op['path']
+        if kind in ('add', 'replace', 'test') and 'value' not in op:
+            raise PatchError(f"'{kind}' needs a value")
+        if kind == 'add':
+            doc = _add(doc, path, copy.deepcopy(op['value']))
+        elif kind == 'remove':
+            doc, _ = _remove(doc, path)
+        elif kind == 'replace':
+            if _parse_pointer(path):
+                doc, _ = _remove(doc, path)
+            doc = _add(doc, path, copy.deepcopy(op['value']))
+        elif kind == 'move':
+            source = op.get('from')
+            if path.startswith(f"{source}/"):
+                raise PatchError("cannot move a value into itself")
+            doc, value = _remove(doc, source)
+            doc = _add(doc, path, value)
+        elif kind == 'copy':
+            doc = _add(doc, path, copy.deepcopy(_get(doc, op.get('from'))))
+        elif kind == 'test':
+            if _get(doc, path) != op['value']:
+                raise PatchError(f"test failed at {path!r}")
+        else:
+            raise PatchError(f"unknown JSON Patch op: {kind!r}")
+    return doc
+
+
+# ---------------------------
+# Requests
+# ---------------------------
+def _decoded(value):
+    # form-encoded requests carry patches as JSON strings
+    if isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            raise PatchError("patch is not valid JSON")
+    return value
+
+
+def wants_patch(data):
+    return any(key in data for key in PATCH_KEYS)
+
+
+def resolve_patch(post, data):
+    """
+    Plain field values for a request with patch keys: checks base_version, applies
+    the patches to the stored post and returns a copy of data without the patch keys.
+    """
+    if ('content_patch' in data or 'content_json_patch' in data) and data.get('base_version') in (None, ''):
+        raise PatchError("content_patch / content_json_patch require base_version")
+    check_base_version(post, data.get('base_version'))
+    resolved = data.copy()
+    for key in PATCH_KEYS:
+        resolved.pop(key, None)
+    if 'content_patch' in data:
+        resolved['content'] = apply_text_patch(post.content, _decoded(data['content_patch']))
+    if 'content_json_patch' in data:
+        try:
+            document = json.loads(post.content_json) if post.content_json else None
+        except ValueError:
+            raise PatchError("stored content_json is not valid JSON; send it whole")
+        patched = apply_json_patch(document, _decoded(data['content_json_patch']))
+        if patched != document:
+            resolved['content_json'] = json.dumps(patched, ensure_ascii=False)
+    return resolved
@@ -0,0 +1,75 @@
+# backend/blog/previews.py
+"""
+Server-side preview store.
+
+Previews used to travel as signing.dumps() tokens holding the whole post, so
+long posts produced huge URLs and every preview request verified a signature
+over the full body. Now the payload lives in the cache under a short random
+id for PREVIEW_MAX_AGE seconds and the URL carries only that id.
+
+Autosaves of an unchanged payload reuse the same id: the hash of the stored
+payload maps to the id of the live entry, whose TTL is refreshed instead of
+storing a copy.
+
+Legacy signed tokens still open (preview_by_token falls back to them) until
+they expire.
+"""
+import hashlib
+import json
+import logging
+import secrets
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+PREVIEW_MAX_AGE = getattr(settings, "PREVIEW_MAX_AGE", 60 * 60)
+PREVIEW_FIELDS = ('title', 'content', 'excerpt', 'featured_image')
+# token_urlsafe(12) -> 16 chars; signed legacy tokens are much longer and contain ':'
+PREVIEW_ID_MAX_LENGTH = 32
+
+
+def _entry_key(preview_id):
+    return f"blog:preview:{preview_id}"
+
+
+def _hash_key(digest):
+    return f"blog:preview:hash:{digest}"
+
+
+def content_hash(payload):
+    # the whole stored payload, extra keys included: an id must never resolve to other metadata
+    canonical = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+def is_preview_id(value):
+    return bool(value) and len(value) <= PREVIEW_ID_MAX_LENGTH and ':' not in value
+
+
+def store_preview(payload):
+    """Store a preview payload and return its id (the existing id if the payload is unchanged)."""
+    payload = {**{f: payload.get(f) or '' for f in PREVIEW_FIELDS},
+               **{k: v for k, v in payload.items() if k not in PREVIEW_FIELDS}}
+    digest = content_hash(payload)
+    try:
+        preview_id = cache.get(_hash_key(digest))
+        if preview_id and cache.touch(_entry_key(preview_id), PREVIEW_MAX_AGE):
+            cache.touch(_hash_key(digest), PREVIEW_MAX_AGE)
+            return preview_id
+    except Exception:
+        logger.exception("previews: lookup by content hash failed")
+
+    preview_id = secrets.token_urlsafe(12)
+    cache.set_many({_entry_key(preview_id): payload, _hash_key(digest): preview_id}, PREVIEW_MAX_AGE)
+    return preview_id
+
+
+def load_preview(preview_id):
+    """The stored payload, or None if unknown or expired."""
+    try:
+        return cache.get(_entry_key(preview_id))
+    except Exception:
+        logger.exception("previews: cache get failed for %s", preview_id)
+        return None
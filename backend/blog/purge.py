@@ -0,0 +1,80 @@
+# backend/blog/purge.py
+"""
+Edge-cache purging by surrogate key.
+
+Public API responses are tagged (Surrogate-Key / Cache-Tag headers, see
+CachedReadMixin in blog/cache.py) with:
+
+- "blog" on every response;
+- "<namespace>-list" on list responses ("posts-list", "categories-list", "tags-list");
+- "<item>-<id>" on detail responses and their sub-resources ("post-12", "tag-3").
+
+Post writes purge post_keys(), plus taxonomy_keys() when the post's status,
+publication date, categories or tags change (the published post counts).
+
+blog/revalidation.py calls purge_keys() from the same post_save/post_delete
+receivers that trigger the Next.js revalidation. The backend is chosen with
+settings.BLOG_PURGE_BACKEND (dotted path to a PurgeBackend subclass);
+the default LocalPurgeBackend only logs, for setups without a CDN.
+"""
+import logging
+from collections import deque
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+SURROGATE_KEY_ALL = 'blog'
+DEFAULT_PURGE_BACKEND = 'blog.purge.LocalPurgeBackend'
+
+
+class PurgeBackend:
+    """Base class: purge(keys) removes every edge-cached response tagged with any of the keys."""
+
+    def purge(self, keys):
+        raise NotImplementedError
+
+
+class LocalPurgeBackend(PurgeBackend):
+    """No CDN: logs the keys and keeps the most recent ones (useful in the shell and in tests)."""
+
+    def __init__(self, history=100):
+        self.purged = deque(maxlen=history)
+
+    def purge(self, keys):
+        self.purged.append(tuple(keys))
+        logger.info("purge (local): %s", ' '.join(keys))
+
+
+_backend = None
+
+
+def get_purge_backend():
+    global _backend
+    if _backend is None:
+        _backend = import_string(getattr(settings, 'BLOG_PURGE_BACKEND', DEFAULT_PURGE_BACKEND))()
+    return _backend
+
+
+def purge_keys(keys):
+    keys = sorted(set(k for k in keys if k))
+    if not keys:
+        return
+    try:
+        get_purge_backend().purge(keys)
+    except Exception:
+        logger.exception("purge: backend failed for keys %s", keys)
+
+
+def post_keys(post_id):
+    return ['posts-list', f'post-{post_id}']
+
+
+def taxonomy_keys(category_ids=(), tag_ids=()):
+    """
+    Category/tag responses carry the count of published posts, so post writes
+    that change visibility or membership purge both lists and the touched items.
+    """
+    return (['categories-list', 'tags-list']
+            + [f'category-{pk}' for pk in category_ids] + [f'tag-{pk}' for pk in tag_ids])
@@ -0,0 +1,99 @@
+# backend/blog/related.py
+"""
+Related-posts index.
+
+Score of a candidate C for post P:
+    TAG_WEIGHT * |tags(P) ∩ tags(C)| + CATEGORY_WEIGHT * |categories(P) ∩ categories(C)|
+    + RECENCY_WEIGHT * 0.5 ** (age_days(C) / RECENCY_HALF_LIFE_DAYS)
+
+Only candidates sharing at least one tag or category are considered. The top
+RELATED_POSTS_LIMIT are stored in RelatedPost, so serving /posts/<slug>/related/
+never touches the M2M tables.
+"""
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .models import Post, RelatedPost
+
+logger = logging.getLogger(__name__)
+
+RELATED_POSTS_LIMIT = getattr(settings, 'BLOG_RELATED_POSTS_LIMIT', 6)
+TAG_WEIGHT = getattr(settings, 'BLOG_RELATED_TAG_WEIGHT', 2.0)
+CATEGORY_WEIGHT = getattr(settings, 'BLOG_RELATED_CATEGORY_WEIGHT', 1.0)
+RECENCY_WEIGHT = getattr(settings, 'BLOG_RELATED_RECENCY_WEIGHT', 1.0)
+RECENCY_HALF_LIFE_DAYS = getattr(settings, 'BLOG_RELATED_RECENCY_HALF_LIFE_DAYS', 180)
+
+
+def score_related(post_id, limit=RELATED_POSTS_LIMIT):
+    """Return [(related_id, score), ...] best first. Three queries regardless of taxonomy size."""
+    tag_through = Post.tags.through
+    category_through = Post.categories.through
+    tag_ids = list(tag_through.objects.filter(post_id=post_id).values_list('tag_id', flat=True))
+    category_ids = list(category_through.objects.filter(post_id=post_id).values_list('category_id', flat=True))
+    if not tag_ids and not category_ids:
+        return []
+
+    shared = {}
+    if tag_ids:
+        rows = (tag_through.objects.filter(tag_id__in=tag_ids).exclude(post_id=post_id)
+                .values('post_id').annotate(n=Count('tag_id')).values_list('post_id', 'n'))
+        for pid, n in rows:
+            shared[pid] = shared.get(pid, 0.0) + TAG_WEIGHT * n
+    if category_ids:
+        rows = (category_through.objects.filter(category_id__in=category_ids).exclude(post_id=post_id)
+                .values('post_id').annotate(n=Count('category_id')).values_list('post_id', 'n'))
+        for pid, n in rows:
+            shared[pid] = shared.get(pid, 0.0) + CATEGORY_WEIGHT * n
+    if not shared:
+        return []
+
+    now = timezone.now()
+    scored = []
+    for pid, published_at in Post.objects.published().filter(pk__in=list(shared)).values_list('id', 'published_at'):
+        age_days = max((now - published_at).total_seconds() / 86400.0, 0.0)
+        recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS) if RECENCY_HALF_LIFE_DAYS else 0.0
+        scored.append((pid, shared[pid] + RECENCY_WEIGHT * recency))
+    # ties broken by newer id for a stable order
+    scored.sort(key=lambda item: (-item[1], -item[0]))
+    return scored[:limit]
+
+
+def rebuild_related_for(post_id, limit=RELATED_POSTS_LIMIT):
+    """Recompute and store the related list of one post. Returns the new related ids."""
+    is_visible = Post.objects.published().filter(pk=post_id).exists()
+    scored = score_related(post_id, limit) if is_visible else []
+    with transaction.atomic():
+        RelatedPost.objects.filter(post_id=post_id).delete()
+        RelatedPost.objects.bulk_create([
+            RelatedPost(post_id=post_id, related_id=rid, score=score) for rid, score in scored
+        ])
+    return [rid for rid, _ in scored]
+
+
+def update_related_index(post_id, extra_ids=()):
+    """
+    Incremental update after a post's taxonomy or visibility changed: the post itself,
+    the posts currently listing it and the posts it now lists are recomputed.
+    Posts that should newly list it without being in either set are picked up by
+    the next `manage.py rebuild_related_posts`.
+    """
+    referencing = set(RelatedPost.objects.filter(related_id=post_id).values_list('post_id', flat=True))
+    new_related = set(rebuild_related_for(post_id))
+    for other_id in (referencing | new_related | set(extra_ids)) - {post_id}:
+        try:
+            rebuild_related_for(other_id)
+        except Exception:
+            logger.exception("related posts: rebuild failed for post id=%s", other_id)
+
+
+def rebuild_all_related(limit=RELATED_POSTS_LIMIT):
+    """Full rebuild; drops entries of posts that are no longer visible. Returns posts processed."""
+    RelatedPost.objects.exclude(post__in=Post.objects.published()).delete()
+    visible_ids = list(Post.objects.published().order_by('id').values_list('id', flat=True))
+    for post_id in visible_ids:
+        rebuild_related_for(post_id, limit)
+    return len(visible_ids)
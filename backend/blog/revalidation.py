@@ -47,21 +47,83 @@ def send_revalidation_request(post_slug=None):
         return False
 
 # Сигнал для автоматической ревалидации при сохранении поста
-from django.db.models.signals import post_save, post_delete
+# (заодно чистим edge-кеш по surrogate-ключам, см. blog/purge.py)
+from django.db import transaction
+from django.db.models.signals import post_save, pre_delete, post_delete, m2m_changed
 from django.dispatch import receiver
-from .models import Post
+from .models import Post, Category, Tag, Comment
+from .purge import SURROGATE_KEY_ALL, post_keys, purge_keys, taxonomy_keys
+
+def _post_taxonomy_keys(post):
+    return taxonomy_keys(post.categories.values_list('id', flat=True), post.tags.values_list('id', flat=True))
 
 @receiver(post_save, sender=Post)
 def revalidate_on_post_save(sender, instance, **kwargs):
     """
     Автоматически отправляет запрос на ревалидацию при сохранении поста
     """
+    # purge regardless of status: an unpublished post must leave the edge cache too
+    keys = post_keys(instance.pk)
+    # _loaded_visibility is set on load by blog/signals.py (and refreshed after this receiver)
+    if kwargs.get('created') or getattr(instance, '_loaded_visibility', None) != (instance.status, instance.published_at):
+        keys += _post_taxonomy_keys(instance)
+    transaction.on_commit(lambda: purge_keys(keys))
     if instance.status == 'published':
         send_revalidation_request(instance.slug)
 
+@receiver(pre_delete, sender=Post)
+def remember_post_taxonomy_keys(sender, instance, **kwargs):
+    # the m2m rows are gone by post_delete
+    instance._purge_taxonomy_keys = _post_taxonomy_keys(instance)
+
 @receiver(post_delete, sender=Post)
 def revalidate_on_post_delete(sender, instance, **kwargs):
     """
     Автоматически отправляет запрос на ревалидацию при удалении поста
     """
-    send_revalidation_request()
\ No newline at end of file
+    keys = post_keys(instance.pk) + getattr(instance, '_purge_taxonomy_keys', taxonomy_keys())
+    transaction.on_commit(lambda: purge_keys(keys))
+    send_revalidation_request()
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def purge_on_post_taxonomy_change(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Пост добавлен/убран из категорий или тегов — меняются ответы поста и счётчики постов
+    """
+    is_categories = sender is Post.categories.through
+    if action == 'pre_clear':
+        # post_clear has no pk_set: remember the other side now
+        related = instance.posts if reverse else (instance.categories if is_categories else instance.tags)
+        instance._purge_cleared_ids = list(related.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    ids = list(pk_set or ()) if action != 'post_clear' else getattr(instance, '_purge_cleared_ids', [])
+    if reverse:
+        item = 'category' if is_categories else 'tag'
+        keys = ['posts-list', f'{item}-{instance.pk}'] + taxonomy_keys() + [f'post-{pk}' for pk in ids]
+    elif is_categories:
+        keys = post_keys(instance.pk) + taxonomy_keys(category_ids=ids)
+    else:
+        keys = post_keys(instance.pk) + taxonomy_keys(tag_ids=ids)
+    transaction.on_commit(lambda: purge_keys(keys))
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Tag)
+def purge_on_taxonomy_change(sender, **kwargs):
+    """
+    Категории и теги встроены в ответы постов — чистим весь блог
+    """
+    transaction.on_commit(lambda: purge_keys([SURROGATE_KEY_ALL]))
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def purge_on_comment_change(sender, instance, **kwargs):
+    """
+    Комментарии и их счётчик входят в ответы поста
+    """
+    keys = post_keys(instance.post_id)
+    transaction.on_commit(lambda: purge_keys(keys))
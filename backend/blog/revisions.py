@@ -0,0 +1,195 @@
+# backend/blog/revisions.py
+"""
+Post revisions stored as compressed deltas.
+
+Each PostRevision of a post points at the previous one (`parent`). Its
+content is zlib-compressed JSON, either:
+
+- a keyframe: the whole content; written for the first revision, every
+  REVISION_KEYFRAME_INTERVAL revisions, and whenever the diff would not be
+  much smaller than the content itself;
+- a delta: ops against the parent's content, over tokens that end at a tag,
+  a newline or a sentence end: [start, end] copies parent tokens, a string
+  is inserted text.
+
+revision_content() replays at most REVISION_KEYFRAME_INTERVAL deltas, read
+in one query. Title and excerpt are small and stored as plain columns.
+
+Autosaves by the same author within REVISION_COALESCE_WINDOW seconds of the
+latest autosave overwrite it instead of adding a row (the latest revision
+never has children, so that is safe); unchanged content adds nothing.
+prune_revisions() drops autosaves older than REVISION_AUTOSAVE_RETENTION_DAYS;
+delete_revisions() re-encodes the survivors so no delta loses its base.
+"""
+import hashlib
+import json
+import re
+import zlib
+from collections import defaultdict
+from datetime import timedelta
+from difflib import SequenceMatcher
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import PostRevision
+
+REVISION_KEYFRAME_INTERVAL = getattr(settings, 'BLOG_REVISION_KEYFRAME_INTERVAL', 20)
+REVISION_COALESCE_WINDOW = getattr(settings, 'BLOG_REVISION_COALESCE_WINDOW', 5 * 60)
+REVISION_AUTOSAVE_RETENTION_DAYS = getattr(settings, 'BLOG_REVISION_AUTOSAVE_RETENTION_DAYS', 30)
+# a delta is kept only if it is at most this fraction of the compressed keyframe
+DELTA_MAX_RATIO = 0.5
+
+_TOKEN_RE = re.compile(r'[^>\n.!?]*[>\n.!?]|[^>\n.!?]+')
+
+
+def _tokens(text):
+    return _TOKEN_RE.findall(text)
+
+
+def _pack(value):
+    return zlib.compress(json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+
+
+def _unpack(data):
+    return json.loads(zlib.decompress(bytes(data)).decode('utf-8'))
+
+
+def content_hash(content):
+    return hashlib.sha256((content or '').encode('utf-8')).hexdigest()
+
+
+def diff_ops(base, content):
+    base_tokens, tokens = _tokens(base), _tokens(content)
+    ops = []
+    matcher = SequenceMatcher(None, base_tokens, tokens, autojunk=False)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            ops.append([i1, i2])
+        elif j1 != j2:
+            ops.append(''.join(tokens[j1:j2]))
+    return ops
+
+
+def apply_ops(base, ops):
+    base_tokens = _tokens(base)
+    return ''.join(''.join(base_tokens[op[0]:op[1]]) if isinstance(op, list) else op for op in ops)
+
+
+def encode(parent, parent_content, content):
+    """(is_keyframe, depth, data) for content stored after parent (None for the first revision)."""
+    full = _pack(content)
+    if parent is None or parent.depth + 1 >= REVISION_KEYFRAME_INTERVAL:
+        return True, 0, full
+    delta = _pack(diff_ops(parent_content, content))
+    if len(delta) > len(full) * DELTA_MAX_RATIO:
+        return True, 0, full
+    return False, parent.depth + 1, delta
+
+
+def _decode(revision, parent_content):
+    payload = _unpack(revision.data) if revision.data else ''
+    return payload if revision.is_keyframe else apply_ops(parent_content, payload)
+
+
+def revision_content(revision):
+    """Full content of a revision: its keyframe plus the deltas after it."""
+    if revision is None:
+        return ''
+    if revision.is_keyframe:
+        return _decode(revision, '')
+    # the chain back to the keyframe is the previous `depth` revisions of the post
+    rows = {r.pk: r for r in PostRevision.objects.filter(post_id=revision.post_id, pk__lt=revision.pk)
+            .order_by('-pk').only('id', 'parent_id', 'is_keyframe', 'data')[:revision.depth]}
+    chain = [revision]
+    while not chain[-1].is_keyframe and chain[-1].parent_id is not None:
+        parent_id = chain[-1].parent_id
+        parent = rows.get(parent_id) or PostRevision.objects.get(pk=parent_id)
+        chain.append(parent)
+    content = ''
+    for node in reversed(chain):
+        content = _decode(node, content)
+    return content
+
+
+def record_revision(post, title, content, excerpt, author=None, autosave=False, meta=None):
+    """
+    Store a revision of post (coalescing recent autosaves). Returns the revision
+    holding this state, which may be an existing one.
+    """
+    title, content, excerpt = title or '', content or '', excerpt or ''
+    digest = content_hash(content)
+    author_id = getattr(author, 'pk', None)
+    with transaction.atomic():
+        latest = PostRevision.objects.select_for_update().filter(post=post).order_by('-pk').first()
+        if latest is not None and (latest.content_hash, latest.title, latest.excerpt) == (digest, title, excerpt):
+            if latest.autosave and not autosave:
+                # an explicit snapshot of the autosaved state: keep it out of autosave pruning
+                latest.autosave = False
+                latest.meta = meta or latest.meta
+                latest.save(update_fields=['autosave', 'meta', 'updated_at'])
+            return latest
+
+        coalesce = (autosave and latest is not None and latest.autosave and latest.author_id == author_id
+                    and (timezone.now() - latest.created_at).total_seconds() < REVISION_COALESCE_WINDOW)
+        if coalesce:
+            revision = latest
+            parent = PostRevision.objects.filter(pk=latest.parent_id).first() if latest.parent_id else None
+        else:
+            revision = PostRevision(post=post, author=author, autosave=autosave)
+            parent = latest
+        revision.is_keyframe, revision.depth, revision.data = encode(parent, revision_content(parent), content)
+        revision.parent = parent
+        revision.title = title
+        revision.excerpt = excerpt
+        revision.content_hash = digest
+        if meta is not None:
+            revision.meta = meta
+        revision.save()
+    return revision
+
+
+def snapshot_post(post, author=None, meta=None):
+    """Explicit (non-autosave) revision of the post's current title/content/excerpt."""
+    return record_revision(post, post.title, post.content, post.excerpt, author=author, autosave=False, meta=meta)
+
+
+def delete_revisions(revisions):
+    """
+    Delete the given revisions (a queryset), re-encoding the later revisions of
+    each affected post against their new parents. Returns the number deleted.
+    """
+    doomed = defaultdict(set)
+    for pk, post_id in revisions.values_list('pk', 'post_id'):
+        doomed[post_id].add(pk)
+    deleted = 0
+    for post_id, ids in doomed.items():
+        with transaction.atomic():
+            chain = list(PostRevision.objects.select_for_update().filter(post_id=post_id).order_by('pk'))
+            contents = {}
+            previous = ''
+            for revision in chain:
+                previous = contents[revision.pk] = _decode(revision, previous)
+            first_deleted = min(ids)
+            parent = None
+            changed = []
+            for revision in chain:
+                if revision.pk in ids:
+                    continue
+                if revision.pk > first_deleted:
+                    parent_content = contents[parent.pk] if parent is not None else ''
+                    revision.is_keyframe, revision.depth, revision.data = encode(
+                        parent, parent_content, contents[revision.pk])
+                    revision.parent = parent
+                    changed.append(revision)
+                parent = revision
+            PostRevision.objects.bulk_update(changed, ['parent', 'is_keyframe', 'depth', 'data'], batch_size=200)
+            deleted += PostRevision.objects.filter(pk__in=ids).delete()[0]
+    return deleted
+
+
+def prune_revisions(retention_days=REVISION_AUTOSAVE_RETENTION_DAYS, now=None):
+    """Delete autosaves last written more than retention_days ago. Returns the number deleted."""
+    cutoff = (now or timezone.now()) - timedelta(days=retention_days)
+    return delete_revisions(PostRevision.objects.filter(autosave=True, updated_at__lt=cutoff))
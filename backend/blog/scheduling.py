@@ -0,0 +1,123 @@
+# backend/blog/scheduling.py
+"""
+Scheduled publishing.
+
+A post with status "published" and a future published_at becomes visible by
+time alone, without any write. Two things make that safe to cache:
+
+- next_scheduled_publish() knows the earliest future published_at (cached
+  until that moment, dropped by blog/signals.py when a post's visibility
+  changes), and read caches cap their timeout with seconds_until_next_publish();
+- `manage.py publish_scheduled [--loop]` runs publish_due_posts() when that
+  moment comes: it bumps the API cache generation, drops the feed sections of
+  the new posts, refreshes their related-posts entries and sends the Next.js
+  revalidation for each of them.
+"""
+import logging
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Min
+from django.utils import timezone
+
+from .models import Post
+
+logger = logging.getLogger(__name__)
+
+NEXT_PUBLISH_KEY = 'blog:scheduling:next_publish'
+LAST_RUN_KEY = 'blog:scheduling:last_run'
+# how far back the first run (or a run after the last-run key was lost) looks for due posts
+SCHEDULER_LOOKBACK = getattr(settings, 'BLOG_SCHEDULER_LOOKBACK', 60 * 60)
+NO_SCHEDULED_TIMEOUT = 60 * 60 * 24
+
+
+def next_scheduled_publish():
+    """Earliest future published_at of a published post, or None."""
+    try:
+        cached = cache.get(NEXT_PUBLISH_KEY)
+    except Exception:
+        logger.exception("scheduling: cache get failed")
+        cached = None
+    now = timezone.now()
+    if cached is not None:
+        moment = datetime.fromtimestamp(cached, tz=dt_timezone.utc) if cached else None
+        if moment is None or moment > now:
+            return moment
+
+    moment = (Post.objects.filter(status='published', published_at__gt=now)
+              .aggregate(m=Min('published_at'))['m'])
+    try:
+        if moment is None:
+            cache.set(NEXT_PUBLISH_KEY, 0, NO_SCHEDULED_TIMEOUT)
+        else:
+            cache.set(NEXT_PUBLISH_KEY, moment.timestamp(), max(1, int((moment - now).total_seconds()) + 1))
+    except Exception:
+        logger.exception("scheduling: cache set failed")
+    return moment
+
+
+def reset_next_publish():
+    try:
+        cache.delete(NEXT_PUBLISH_KEY)
+    except Exception:
+        logger.exception("scheduling: could not reset next publish time")
+
+
+def seconds_until_next_publish():
+    """Whole seconds until the next scheduled post becomes visible, or None if nothing is scheduled."""
+    try:
+        moment = next_scheduled_publish()
+    except Exception:
+        logger.exception("scheduling: could not determine next publish time")
+        return None
+    if moment is None:
+        return None
+    return max(0, int((moment - timezone.now()).total_seconds()))
+
+
+def cap_timeout(timeout):
+    """Shorten a cache timeout so entries never outlive the next scheduled publish."""
+    seconds = seconds_until_next_publish()
+    if seconds is None:
+        return timeout
+    return max(1, min(timeout, seconds))
+
+
+def publish_due_posts(now=None):
+    """
+    Handle posts whose published_at passed since the previous run.
+    Returns the list of their ids.
+    """
+    # local imports: these modules import models/signals wiring of their own
+    from .cache import bump_generation
+    from .feeds import invalidate_for_post
+    from .related import update_related_index
+    from .revalidation import send_revalidation_request
+
+    now = now or timezone.now()
+    last_run = None
+    try:
+        last_run = cache.get(LAST_RUN_KEY)
+    except Exception:
+        logger.exception("scheduling: cache get failed for last run")
+    since = (datetime.fromtimestamp(last_run, tz=dt_timezone.utc) if last_run
+             else now - timedelta(seconds=SCHEDULER_LOOKBACK))
+
+    due = list(Post.objects.filter(status='published', published_at__gt=since, published_at__lte=now)
+               .order_by('published_at').values_list('id', 'slug'))
+    if due:
+        bump_generation()
+        for post_id, slug in due:
+            invalidate_for_post(post_id)
+            try:
+                update_related_index(post_id)
+            except Exception:
+                logger.exception("scheduling: related index update failed for post id=%s", post_id)
+            send_revalidation_request(slug)
+    reset_next_publish()
+    try:
+        cache.set(LAST_RUN_KEY, now.timestamp(), None)
+    except Exception:
+        logger.exception("scheduling: cache set failed for last run")
+    return [post_id for post_id, _ in due]
@@ -1,6 +1,11 @@
 # backend/blog/serializers.py
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Post, Category, Tag, Comment, PostReaction, PostAttachment
+from rest_framework.utils.urls import replace_query_param
+from .comments import load_thread_page
+from .html_pipeline import render_content
+from .taxonomy import TaxonomyListSerializer
+from .models import Post, Category, Tag, Comment, PostAttachment
 
 class CategorySerializer(serializers.ModelSerializer):
     class Meta:
@@ -12,6 +17,20 @@ class TagSerializer(serializers.ModelSerializer):
         model = Tag
         fields = ('id', 'title', 'slug')
 
+class CategoryCountSerializer(CategorySerializer):
+    # annotated by CategoryViewSet.get_queryset
+    post_count = serializers.IntegerField(read_only=True)
+
+    class Meta(CategorySerializer.Meta):
+        fields = CategorySerializer.Meta.fields + ('post_count',)
+
+class TagCountSerializer(TagSerializer):
+    # annotated by TagViewSet.get_queryset
+    post_count = serializers.IntegerField(read_only=True)
+
+    class Meta(TagSerializer.Meta):
+        fields = TagSerializer.Meta.fields + ('post_count',)
+
 class CommentSerializer(serializers.ModelSerializer):
     replies = serializers.SerializerMethodField()
     user = serializers.StringRelatedField(read_only=True)
@@ -22,8 +41,11 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('is_moderated', 'created_at', 'replies')
 
     def get_replies(self, obj):
-        qs = obj.replies.filter(is_public=True)
-        return CommentSerializer(qs, many=True).data
+        # threads loaded via blog.comments come with their replies pre-assembled
+        replies = getattr(obj, 'thread_replies', None)
+        if replies is None:
+            replies = obj.replies.filter(is_public=True)
+        return CommentSerializer(replies, many=True, context=self.context).data
 
 class AttachmentSerializer(serializers.ModelSerializer):
     url = serializers.SerializerMethodField()
@@ -53,13 +75,29 @@ class AttachmentSerializer(serializers.ModelSerializer):
 class PostListSerializer(serializers.ModelSerializer):
     excerpt = serializers.SerializerMethodField()
     featured_image = serializers.SerializerMethodField()
-    categories = CategorySerializer(many=True, read_only=True)
-    tags = TagSerializer(many=True, read_only=True)
+    categories = serializers.SerializerMethodField()
+    tags = serializers.SerializerMethodField()
     url = serializers.SerializerMethodField()
+    reading_time = serializers.IntegerField(source='reading_minutes', read_only=True)
 
     class Meta:
         model = Post
-        fields = ('id', 'title', 'slug', 'excerpt', 'featured_image', 'categories', 'tags', 'published_at', 'url')
+        fields = ('id', 'title', 'slug', 'excerpt', 'featured_image', 'categories', 'tags', 'published_at', 'url',
+                  'comments_count', 'likes_count', 'views_count', 'word_count', 'reading_time')
+        # lists render categories/tags from the in-process taxonomy snapshot
+        list_serializer_class = TaxonomyListSerializer
+
+    def get_categories(self, obj):
+        cached = getattr(obj, '_serialized_categories', None)
+        if cached is not None:
+            return cached
+        return CategorySerializer(obj.categories.all(), many=True, context=self.context).data
+
+    def get_tags(self, obj):
+        cached = getattr(obj, '_serialized_tags', None)
+        if cached is not None:
+            return cached
+        return TagSerializer(obj.tags.all(), many=True, context=self.context).data
 
     def get_url(self, obj):
         try:
@@ -102,15 +140,14 @@ class PostListSerializer(serializers.ModelSerializer):
         except Exception:
             pass
 
-        # fallback to first attachment (defensive)
+        # fallback to the denormalized cover (first attachment); select_related by the viewset
         try:
-            if hasattr(obj, 'attachments'):
-                first_obj = obj.attachments.all().order_by('id').first()
-                if first_obj and getattr(first_obj, 'file', None):
-                    try:
-                        return first_obj.file.url
-                    except Exception:
-                        return getattr(first_obj.file, 'name', None)
+            cover = getattr(obj, 'cover_attachment', None)
+            if cover and getattr(cover, 'file', None):
+                try:
+                    return cover.file.url
+                except Exception:
+                    return getattr(cover.file, 'name', None)
         except Exception:
             pass
         return None
@@ -124,39 +161,78 @@ class PostListSerializer(serializers.ModelSerializer):
         except Exception:
             pass
         try:
-            content = getattr(obj, 'content', '') or ''
-            # naive html-stripping could be added but keep simple: plain text slice
-            snippet = content.strip()
-            if len(snippet) > 240:
-                return snippet[:237].rsplit(' ', 1)[0] + '...'
-            return snippet or ''
+            # HTML-stripped excerpt precomputed on save; content itself is deferred in lists
+            return getattr(obj, 'auto_excerpt', '') or ''
         except Exception:
             return ''
 
 class PostDetailSerializer(PostListSerializer):
     author = serializers.StringRelatedField(read_only=True)
-    comments = CommentSerializer(many=True, read_only=True)
-    likes_count = serializers.SerializerMethodField()
+    # processed on save by blog/html_pipeline.py; sanitized on the fly if content_html is missing
+    content = serializers.SerializerMethodField()
+    comments = serializers.SerializerMethodField()
+    comments_next = serializers.SerializerMethodField()
     attachments = AttachmentSerializer(many=True, read_only=True)
 
     class Meta(PostListSerializer.Meta):
         model = Post
-        fields = PostListSerializer.Meta.fields + ('content', 'author', 'created_at', 'updated_at', 'meta_title', 'meta_description', 'og_image', 'status', 'comments', 'likes_count', 'attachments')
+        fields = PostListSerializer.Meta.fields + ('content', 'toc', 'author', 'created_at', 'updated_at', 'meta_title', 'meta_description', 'og_image', 'status', 'comments', 'comments_next', 'attachments')
+
+    def get_content(self, obj):
+        # never the raw body: rows written around save() (queryset.update) are rendered here
+        if obj.content_html or not obj.content:
+            return obj.content_html
+        return render_content(obj.content, probe_images=False)[0]
+
+    def _first_comment_page(self, obj):
+        # only the first page of threads is embedded; the rest comes from /posts/<slug>/comments/
+        page = getattr(obj, '_first_comment_page', None)
+        if page is None:
+            page = load_thread_page(obj.pk)
+            obj._first_comment_page = page
+        return page
+
+    def get_comments(self, obj):
+        roots, _ = self._first_comment_page(obj)
+        return CommentSerializer(roots, many=True, context=self.context).data
+
+    def get_comments_next(self, obj):
+        roots, has_more = self._first_comment_page(obj)
+        if not has_more:
+            return None
+        url = reverse('blog:post-comments', kwargs={'slug': obj.slug})
+        request = self.context.get('request')
+        if request is not None:
+            url = request.build_absolute_uri(url)
+        return replace_query_param(url, 'after', roots[-1].pk)
+
+class PostBatchSerializer(PostDetailSerializer):
+    """Detail payload for GET /posts/batch/: no comment threads, which cost queries per post."""
+    class Meta(PostDetailSerializer.Meta):
+        fields = tuple(f for f in PostDetailSerializer.Meta.fields if f not in ('comments', 'comments_next'))
 
-    def get_likes_count(self, obj):
-        try:
-            # safer: don't assume exactly one PostReaction object
-            reaction = obj.reactions.all().first()
-            if reaction:
-                return reaction.likes_count()
-        except Exception:
-            pass
-        return 0
+
+class PostExportSerializer(PostBatchSerializer):
+    """Detail payload for the NDJSON export (blog/export.py): no comment threads."""
+    class Meta(PostBatchSerializer.Meta):
+        fields = PostBatchSerializer.Meta.fields + ('content_json',)
 
 class PostCreateUpdateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Post
         fields = (
-            'title', 'slug', 'excerpt', 'content', 'featured_image',
+            'title', 'slug', 'excerpt', 'content', 'content_json', 'featured_image',
             'categories', 'tags', 'meta_title', 'meta_description', 'og_image', 'status', 'published_at'
         )
+
+    def update(self, instance, validated_data):
+        # write only the columns whose value changed (bodies can be hundreds of KB)
+        relations = {f: validated_data.pop(f) for f in ('categories', 'tags') if f in validated_data}
+        changed = [f for f, value in validated_data.items() if getattr(instance, f) != value]
+        for field in changed:
+            setattr(instance, field, validated_data[field])
+        if changed:
+            instance.save(update_fields=changed + ['updated_at'])
+        for field, value in relations.items():
+            getattr(instance, field).set(value)  # set() only adds/removes the difference
+        return instance
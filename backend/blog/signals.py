@@ -0,0 +1,339 @@
+# backend/blog/signals.py
+"""
+Signals keeping denormalized blog data current.
+
+- API cache: every write that can change a public response bumps the cache
+  generation once the surrounding transaction commits (bumping earlier would
+  let a concurrent reader re-cache the pre-commit state).
+- Post.cover_attachment: recomputed when attachments are added, moved or removed.
+- Post engagement counters: F() increments from the comment, like and view write paths.
+- Related-posts index: refreshed after commit when a post's taxonomy or visibility changes.
+- Sitemap/feed documents: the sections a published post appears in are dropped after commit.
+- Taxonomy snapshot: category/tag writes bump its version so every worker rebuilds it.
+- Scheduled publishing: the cached next publish time is dropped when a post's visibility changes.
+- Open Graph cards: published posts get theirs (re)generated after commit when title/category/cover changed.
+- Date archive: ArchiveMonth counters follow publish/unpublish/date changes and deletes.
+- Export tombstones: deleted published posts are remembered for incremental exports.
+- Slug history: a changed slug is kept as a redirect; cached slug lookups are dropped after commit.
+"""
+import logging
+
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver
+
+from .archive import record_visibility_change
+from .cache import bump_generation
+from .counters import bump_counter, reconcile_post_counters
+from .feeds import invalidate_for_post
+from .og_images import schedule_og_image
+from .related import rebuild_related_for, update_related_index
+from .scheduling import reset_next_publish
+from .slugs import forget as forget_slug_references, record_slug_change
+from .taxonomy import bump_version as bump_taxonomy_version
+from .models import (
+    Post, Category, Tag, Comment, PostReaction, PostAttachment, MediaLibrary, PostView, RelatedPost,
+    SlugHistory, PostTombstone, refresh_cover_attachment,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def _invalidate_api_cache(**kwargs):
+    transaction.on_commit(bump_generation)
+
+
+# MediaLibrary is a proxy of PostAttachment: proxy saves send signals with the proxy as sender
+for _model in (Post, Category, Tag, Comment, PostReaction, PostAttachment, MediaLibrary):
+    post_save.connect(_invalidate_api_cache, sender=_model, dispatch_uid=f'blog_api_cache_save_{_model.__name__}')
+    post_delete.connect(_invalidate_api_cache, sender=_model, dispatch_uid=f'blog_api_cache_delete_{_model.__name__}')
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(m2m_changed, sender=PostReaction.users.through)
+def invalidate_api_cache_on_m2m(sender, action, **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        transaction.on_commit(bump_generation)
+
+
+# ---------------------------
+# Post.cover_attachment
+# ---------------------------
+@receiver(post_init, sender=PostAttachment)
+@receiver(post_init, sender=MediaLibrary)
+def remember_attachment_post(sender, instance, **kwargs):
+    # read from __dict__ so a deferred post_id does not trigger a query per instance
+    instance._loaded_post_id = instance.__dict__.get('post_id')
+
+
+@receiver(post_save, sender=PostAttachment)
+@receiver(post_save, sender=MediaLibrary)
+def update_cover_on_attachment_save(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_loaded_post_id', None)
+    if created or previous != instance.post_id:
+        for post_id in {previous, instance.post_id} - {None}:
+            refresh_cover_attachment(post_id)
+    instance._loaded_post_id = instance.post_id
+
+
+@receiver(post_delete, sender=PostAttachment)
+@receiver(post_delete, sender=MediaLibrary)
+def update_cover_on_attachment_delete(sender, instance, **kwargs):
+    refresh_cover_attachment(instance.post_id)
+
+
+# ---------------------------
+# Post engagement counters
+# ---------------------------
+@receiver(post_init, sender=Comment)
+def remember_comment_state(sender, instance, **kwargs):
+    instance._loaded_counted = (instance.__dict__.get('post_id'), instance.__dict__.get('is_public'))
+
+
+@receiver(post_save, sender=Comment)
+def count_comment_on_save(sender, instance, created, **kwargs):
+    old_post_id, old_public = (None, False) if created else getattr(instance, '_loaded_counted', (None, None))
+    if old_public is None:
+        # state unknown (deferred fields) — fix up just this post from the source table
+        reconcile_post_counters(Post.objects.filter(pk=instance.post_id))
+    elif (old_post_id, bool(old_public)) != (instance.post_id, bool(instance.is_public)):
+        if old_public:
+            bump_counter(old_post_id, 'comments_count', -1)
+        if instance.is_public:
+            bump_counter(instance.post_id, 'comments_count', 1)
+    instance._loaded_counted = (instance.post_id, instance.is_public)
+
+
+@receiver(post_delete, sender=Comment)
+def count_comment_on_delete(sender, instance, **kwargs):
+    if instance.is_public:
+        bump_counter(instance.post_id, 'comments_count', -1)
+
+
+@receiver(post_init, sender=PostReaction)
+def remember_reaction_anon_count(sender, instance, **kwargs):
+    instance._loaded_anon_count = instance.__dict__.get('anon_count')
+
+
+@receiver(post_save, sender=PostReaction)
+def count_anonymous_likes(sender, instance, created, **kwargs):
+    previous = 0 if created else getattr(instance, '_loaded_anon_count', None)
+    if previous is None:
+        reconcile_post_counters(Post.objects.filter(pk=instance.post_id))
+    else:
+        bump_counter(instance.post_id, 'likes_count', (instance.anon_count or 0) - previous)
+    instance._loaded_anon_count = instance.anon_count
+
+
+@receiver(post_delete, sender=PostReaction)
+def recount_likes_on_reaction_delete(sender, instance, **kwargs):
+    if instance.post_id:
+        reconcile_post_counters(Post.objects.filter(pk=instance.post_id))
+
+
+@receiver(m2m_changed, sender=PostReaction.users.through)
+def count_user_likes(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear':
+        # remember who is about to be removed; post_clear receives no pk_set
+        if reverse:
+            instance._cleared_reaction_posts = list(
+                PostReaction.objects.filter(users=instance).values_list('post_id', flat=True))
+        else:
+            instance._cleared_like_count = instance.users.count()
+        return
+    if action == 'post_clear':
+        if reverse:
+            for post_id in getattr(instance, '_cleared_reaction_posts', []):
+                bump_counter(post_id, 'likes_count', -1)
+        else:
+            bump_counter(instance.post_id, 'likes_count', -getattr(instance, '_cleared_like_count', 0))
+        return
+    if action not in ('post_add', 'post_remove') or not pk_set:
+        return
+    sign = 1 if action == 'post_add' else -1
+    if reverse:
+        # user.liked_posts.add(reaction, ...): pk_set holds PostReaction ids
+        for post_id in PostReaction.objects.filter(pk__in=pk_set).values_list('post_id', flat=True):
+            bump_counter(post_id, 'likes_count', sign)
+    else:
+        bump_counter(instance.post_id, 'likes_count', sign * len(pk_set))
+
+
+@receiver(post_save, sender=PostView)
+def count_view(sender, instance, created, **kwargs):
+    if created:
+        bump_counter(instance.post_id, 'views_count', 1)
+
+
+@receiver(post_delete, sender=PostView)
+def uncount_view(sender, instance, **kwargs):
+    bump_counter(instance.post_id, 'views_count', -1)
+
+
+# ---------------------------
+# Related-posts index
+# ---------------------------
+def _visibility(instance):
+    return instance.__dict__.get('status'), instance.__dict__.get('published_at')
+
+
+def _schedule_related_update(post_id):
+    transaction.on_commit(lambda: update_related_index(post_id))
+
+
+@receiver(post_init, sender=Post)
+def remember_post_visibility(sender, instance, **kwargs):
+    instance._loaded_visibility = _visibility(instance)
+
+
+@receiver(post_save, sender=Post)
+def update_related_on_post_save(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_loaded_visibility', None) != _visibility(instance):
+        _schedule_related_update(instance.pk)
+
+
+@receiver(m2m_changed, sender=Post.categories.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+def update_related_on_taxonomy_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # tag.posts.clear(): post_clear has no pk_set, remember the affected posts now
+        instance._cleared_post_ids = list(getattr(instance, 'posts').values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _schedule_related_update(instance.pk)
+        return
+    post_ids = pk_set if action != 'post_clear' else getattr(instance, '_cleared_post_ids', [])
+    for post_id in post_ids or ():
+        _schedule_related_update(post_id)
+
+
+@receiver(pre_delete, sender=Post)
+def remember_posts_listing_deleted_post(sender, instance, **kwargs):
+    instance._listed_by = list(RelatedPost.objects.filter(related_id=instance.pk).values_list('post_id', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def update_related_on_post_delete(sender, instance, **kwargs):
+    for post_id in getattr(instance, '_listed_by', []):
+        transaction.on_commit(lambda post_id=post_id: rebuild_related_for(post_id))
+
+
+# ---------------------------
+# Sitemap / feeds
+# ---------------------------
+def _was_or_is_published(instance):
+    loaded_status = getattr(instance, '_loaded_visibility', (None, None))[0]
+    return 'published' in (loaded_status, instance.status)
+
+
+@receiver(post_save, sender=Post)
+def invalidate_feeds_on_post_save(sender, instance, **kwargs):
+    if _was_or_is_published(instance):
+        transaction.on_commit(lambda: invalidate_for_post(instance.pk))
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_feeds_on_post_delete(sender, instance, **kwargs):
+    if _was_or_is_published(instance):
+        post_id = instance.pk
+        transaction.on_commit(lambda: invalidate_for_post(post_id))
+
+
+# ---------------------------
+# Taxonomy snapshot
+# ---------------------------
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Tag)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Tag)
+def invalidate_taxonomy_snapshot(sender, **kwargs):
+    transaction.on_commit(bump_taxonomy_version)
+
+
+# ---------------------------
+# Scheduled publishing
+# ---------------------------
+@receiver(post_save, sender=Post)
+def reset_next_publish_on_post_save(sender, instance, created, **kwargs):
+    if created or getattr(instance, '_loaded_visibility', None) != _visibility(instance):
+        transaction.on_commit(reset_next_publish)
+
+
+@receiver(post_delete, sender=Post)
+def reset_next_publish_on_post_delete(sender, instance, **kwargs):
+    transaction.on_commit(reset_next_publish)
+
+
+# ---------------------------
+# Open Graph cards
+# ---------------------------
+@receiver(post_save, sender=Post)
+def generate_og_image_on_publish(sender, instance, **kwargs):
+    # rendered on the og_images worker pool; unchanged inputs cost one small query there
+    if instance.status == 'published':
+        transaction.on_commit(lambda: schedule_og_image(instance))
+
+
+# ---------------------------
+# Date archive
+# ---------------------------
+@receiver(post_save, sender=Post)
+def update_archive_on_post_save(sender, instance, created, **kwargs):
+    old = None if created else getattr(instance, '_loaded_visibility', None)
+    record_visibility_change(old, _visibility(instance))
+
+
+@receiver(post_delete, sender=Post)
+def update_archive_on_post_delete(sender, instance, **kwargs):
+    record_visibility_change(getattr(instance, '_loaded_visibility', None), None)
+
+
+# ---------------------------
+# Export tombstones
+# ---------------------------
+@receiver(post_delete, sender=Post)
+def record_post_tombstone(sender, instance, **kwargs):
+    if getattr(instance, '_loaded_visibility', (None, None))[0] == 'published':
+        PostTombstone.objects.create(post_id=instance.pk, slug=instance.slug)
+
+
+# ---------------------------
+# Slug history
+# ---------------------------
+@receiver(post_init, sender=Post)
+def remember_post_slug(sender, instance, **kwargs):
+    instance._loaded_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Post)
+def record_slug_history(sender, instance, created, **kwargs):
+    old_slug = getattr(instance, '_loaded_slug', None)
+    if created or old_slug != instance.slug:
+        stale = record_slug_change(instance, None if created else old_slug)
+        transaction.on_commit(lambda: forget_slug_references(*stale))
+
+
+@receiver(pre_delete, sender=Post)
+def remember_slug_references(sender, instance, **kwargs):
+    # history rows are cascaded away before post_delete
+    instance._slug_references = [instance.slug, str(instance.pk)] + list(
+        SlugHistory.objects.filter(post=instance).values_list('slug', flat=True))
+
+
+@receiver(post_delete, sender=Post)
+def forget_slugs_on_post_delete(sender, instance, **kwargs):
+    stale = getattr(instance, '_slug_references', [instance.slug])
+    transaction.on_commit(lambda: forget_slug_references(*stale))
+
+
+# ---------------------------
+# Keep this last: receivers above compare against the state loaded from the DB,
+# so the snapshot is refreshed only after all of them ran.
+# ---------------------------
+@receiver(post_save, sender=Post)
+def refresh_post_snapshot(sender, instance, **kwargs):
+    instance._loaded_visibility = _visibility(instance)
+    instance._loaded_slug = instance.slug
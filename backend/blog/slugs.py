@@ -0,0 +1,82 @@
+# backend/blog/slugs.py
+"""
+Post lookup by slug, old slug or id.
+
+resolve_post_reference() maps a URL value to (post id, current slug) with at
+most three indexed lookups (current slug, SlugHistory, pk) and caches the
+answer, so repeated hits on popular and renamed URLs cost one cache read.
+Visibility is not part of the cached answer: the caller fetches the post by
+pk from its own (published-filtered) queryset.
+
+Cache entries are dropped by blog/signals.py when a post's slug changes or
+the post is deleted.
+"""
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+
+from .models import Post, SlugHistory
+
+logger = logging.getLogger(__name__)
+
+SLUG_CACHE_TIMEOUT = getattr(settings, 'BLOG_SLUG_CACHE_TIMEOUT', 60 * 60 * 24)
+# unknown values are remembered briefly; creating a post with that slug clears the entry
+SLUG_MISS_CACHE_TIMEOUT = 60
+
+
+def _cache_key(value):
+    return f"blog:slug:{value}"
+
+
+def resolve_post_reference(value):
+    """(post_id, current_slug) for a current slug, an old slug or a numeric id; None if unknown."""
+    value = str(value).strip()
+    key = _cache_key(value)
+    try:
+        cached = cache.get(key)
+    except Exception:
+        logger.exception("slugs: cache get failed for %s", value)
+        cached = None
+    if cached is not None:
+        return tuple(cached) or None
+
+    found = Post.objects.filter(slug=value).values_list('id', 'slug').first()
+    if found is None:
+        found = SlugHistory.objects.filter(slug=value).values_list('post_id', 'post__slug').first()
+    if found is None and value.isdigit():
+        found = Post.objects.filter(pk=int(value)).values_list('id', 'slug').first()
+
+    try:
+        if found is None:
+            cache.set(key, [], SLUG_MISS_CACHE_TIMEOUT)
+        else:
+            cache.set(key, list(found), SLUG_CACHE_TIMEOUT)
+    except Exception:
+        logger.exception("slugs: cache set failed for %s", value)
+    return found
+
+
+def forget(*values):
+    try:
+        cache.delete_many([_cache_key(v) for v in values if v])
+    except Exception:
+        logger.exception("slugs: could not drop cached references %s", values)
+
+
+def record_slug_change(post, old_slug):
+    """
+    Keep old_slug pointing at the post; its current slug must not stay in history.
+    Returns the values whose cached answers are now stale (drop them with forget() after commit).
+    """
+    SlugHistory.objects.filter(slug=post.slug).delete()
+    if old_slug and old_slug != post.slug:
+        try:
+            with transaction.atomic():
+                SlugHistory.objects.update_or_create(slug=old_slug, defaults={'post': post})
+        except IntegrityError:
+            logger.warning("slugs: could not record old slug %s of post id=%s", old_slug, post.pk)
+    # every cached answer naming the post: old slugs now lead to the new slug
+    history = list(SlugHistory.objects.filter(post=post).values_list('slug', flat=True))
+    return [old_slug, post.slug, str(post.pk), *history]
@@ -0,0 +1,98 @@
+# backend/blog/taxonomy.py
+"""
+In-process cache of serialized categories and tags.
+
+Categories and tags are few and change rarely, while every post list page
+repeats them. Each worker keeps one snapshot ({id: serialized dict} plus the
+display order) tagged with a version stored in the shared cache; saving or
+deleting a Category/Tag bumps the version (blog/signals.py), so every worker
+rebuilds its snapshot on next use.
+
+TaxonomyListSerializer attaches category/tag ids to a page of posts with two
+through-table queries, and PostListSerializer renders them from the snapshot
+instead of prefetching and re-serializing the same objects per post.
+"""
+import logging
+import threading
+
+from rest_framework import serializers
+
+from .cache import bump_generation, get_generation
+from .models import Post, Category, Tag
+
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = 'blog:taxonomy:version'
+
+_lock = threading.Lock()
+_snapshot = {'version': None}
+
+
+def bump_version():
+    bump_generation(VERSION_KEY)
+
+
+def _build_snapshot(version):
+    # local import: serializers imports this module
+    from .serializers import CategorySerializer, TagSerializer
+
+    snapshot = {'version': version}
+    for kind, model, serializer_class in (('categories', Category, CategorySerializer), ('tags', Tag, TagSerializer)):
+        objects = list(model.objects.all())
+        # (items by id, position in the model's default ordering)
+        snapshot[kind] = (
+            {obj.pk: dict(serializer_class(obj).data) for obj in objects},
+            {obj.pk: i for i, obj in enumerate(objects)},
+        )
+    return snapshot
+
+
+def get_snapshot():
+    """Current snapshot; rebuilt when the shared version moved (or is unreadable)."""
+    global _snapshot
+    version = get_generation(VERSION_KEY)
+    snapshot = _snapshot
+    if version is not None and snapshot['version'] == version:
+        return snapshot
+    with _lock:
+        if version is None or _snapshot['version'] != version:
+            _snapshot = _build_snapshot(version)
+        return _snapshot
+
+
+def _render_terms(ids, items, order):
+    # ids created after the snapshot (a request racing the version bump) are skipped
+    return [items[i] for i in sorted((i for i in ids if i in items), key=order.get)]
+
+
+def attach_taxonomy(posts):
+    """
+    Set `_serialized_categories` / `_serialized_tags` on each post from the snapshot:
+    two through-table queries and one version check for the whole page.
+    """
+    posts = [p for p in posts if getattr(p, 'pk', None)]
+    if not posts:
+        return
+    post_ids = [p.pk for p in posts]
+    category_ids = {pid: [] for pid in post_ids}
+    tag_ids = {pid: [] for pid in post_ids}
+    for post_id, category_id in (Post.categories.through.objects
+                                 .filter(post_id__in=post_ids).values_list('post_id', 'category_id')):
+        category_ids[post_id].append(category_id)
+    for post_id, tag_id in (Post.tags.through.objects
+                            .filter(post_id__in=post_ids).values_list('post_id', 'tag_id')):
+        tag_ids[post_id].append(tag_id)
+    snapshot = get_snapshot()
+    for post in posts:
+        post._serialized_categories = _render_terms(category_ids[post.pk], *snapshot['categories'])
+        post._serialized_tags = _render_terms(tag_ids[post.pk], *snapshot['tags'])
+
+
+class TaxonomyListSerializer(serializers.ListSerializer):
+    def to_representation(self, data):
+        posts = list(data.all() if hasattr(data, 'all') else data)
+        try:
+            attach_taxonomy(posts)
+        except Exception:
+            logger.exception("taxonomy: could not attach categories/tags; falling back to per-post relations")
+        return [self.child.to_representation(post) for post in posts]
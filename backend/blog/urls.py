@@ -9,6 +9,8 @@ from .views import (
     CommentViewSet,
     reaction_detail,
     reaction_toggle,
+    autocomplete,
+    export_posts,
     quick_action_view,
     dashboard_stats,
     media_list,
@@ -23,6 +25,8 @@ from .views import (
     get_csrf_token,  # <-- new
 )
 
+from .feeds import sitemap_index_view, sitemap_posts_view, rss_feed_view, atom_feed_view
+
 # Импортируем админский view медиатеки из blog.admin
 from .admin import admin_media_library_view
 
@@ -37,6 +41,13 @@ router.register(r'comments', CommentViewSet, basename='comment')
 urlpatterns = [
     path('', include(router.urls)),
 
+    path('autocomplete/', autocomplete, name='autocomplete'),
+
+    path('export/posts.ndjson', export_posts, name='export-posts'),
+
+    path('archive/', PostViewSet.as_view({'get': 'archive'}), name='archive'),
+    path('archive/<int:year>/<int:month>/', PostViewSet.as_view({'get': 'archive_month'}), name='archive-month'),
+
     path('reactions/detail/', reaction_detail, name='reaction-detail'),
     path('reactions/toggle/', reaction_toggle, name='reaction-toggle'),
 
@@ -59,6 +70,12 @@ urlpatterns = [
     path('revisions/autosave/', autosave_revision, name='revisions-autosave'),
     path('revisions/delete/', revisions_delete, name='revisions-delete'),
 
+    # Prebuilt sitemap / feeds (cached documents with ETag + Last-Modified)
+    path('sitemap.xml', sitemap_index_view, name='sitemap-index'),
+    path('sitemap-posts-<int:chunk>.xml', sitemap_posts_view, name='sitemap-posts'),
+    path('feed/rss/', rss_feed_view, name='feed-rss'),
+    path('feed/atom/', atom_feed_view, name='feed-atom'),
+
     # PUBLIC CSRF token endpoint — frontend should call this (with credentials: include)
     path('csrf/', get_csrf_token, name='csrf-token'),
 ]
@@ -1,5 +1,8 @@
 # backend/blog/utils.py
+import html
 import re
+from django.db.models import Q
+from django.utils.html import strip_tags
 from django.utils.text import slugify as dj_slugify
 
 CYRILLIC_TO_LATIN = {
@@ -33,3 +36,77 @@ def translit_slugify(value: str, allow_unicode=False) -> str:
     # ensure ascii-only, replace multiple hyphens
     slug = re.sub(r'-{2,}', '-', slug).strip('-')
     return slug[:200]
+
+
+def allocate_slug(model, source: str, exclude_pk=None, field: str = 'slug', max_length: int = None, fallback: str = 'item') -> str:
+    """
+    Return a free slug for `model` derived from `source` using one prefix query.
+
+    All existing "<base>" / "<base>-N" slugs are fetched at once and the next suffix
+    after the highest N is picked in Python (freed numbers are not reused, so old links
+    never start pointing at a different object). Concurrent writers can still race
+    to the same value — callers retry on IntegrityError (see SlugAllocationMixin).
+    """
+    max_length = max_length or model._meta.get_field(field).max_length
+    # leave room for a "-NNNN" suffix
+    base = (translit_slugify(source) or fallback)[:max(1, max_length - 8)].strip('-') or fallback
+
+    # the prefix condition is served by the slug index; the regex only trims "<base>-other-words"
+    qs = (model._default_manager
+          .filter(**{f'{field}__startswith': base})
+          .filter(Q(**{field: base}) | Q(**{f'{field}__regex': r'^%s-[0-9]+$' % re.escape(base)}))
+          .values_list(field, flat=True))
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    suffix_re = re.compile(r'^%s-(\d+)$' % re.escape(base))
+    taken_base = False
+    highest = 1
+    for existing in qs:
+        if existing == base:
+            taken_base = True
+            continue
+        match = suffix_re.match(existing)
+        if match:
+            highest = max(highest, int(match.group(1)))
+    if not taken_base:
+        return base
+    return f"{base}-{highest + 1}"
+
+
+WORDS_PER_MINUTE = 200
+EXCERPT_LENGTH = 240
+
+_BLOCK_TAG_RE = re.compile(r'<\s*(br|/p|/div|/li|/h[1-6]|/tr|/blockquote)\b[^>]*>', re.IGNORECASE)
+_SCRIPT_STYLE_RE = re.compile(r'<(script|style)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_WHITESPACE_RE = re.compile(r'\s+')
+
+
+def html_to_text(value: str) -> str:
+    """Strip tags/scripts from HTML, unescape entities and collapse whitespace."""
+    if not value:
+        return ''
+    value = _SCRIPT_STYLE_RE.sub(' ', value)
+    # keep word boundaries where block elements end ("<p>a</p><p>b</p>" -> "a b")
+    value = _BLOCK_TAG_RE.sub(' ', value)
+    value = html.unescape(strip_tags(value))
+    return _WHITESPACE_RE.sub(' ', value).strip()
+
+
+def make_excerpt(text: str, length: int = EXCERPT_LENGTH) -> str:
+    """Cut plain text to `length` chars on a word boundary, with an ellipsis."""
+    text = (text or '').strip()
+    if len(text) <= length:
+        return text
+    return text[:length - 3].rsplit(' ', 1)[0] + '...'
+
+
+def text_metrics(content_html: str) -> dict:
+    """Plain text, word count, reading time (minutes) and excerpt for a post body."""
+    text = html_to_text(content_html)
+    word_count = len(text.split())
+    return {
+        'plain_text': text,
+        'word_count': word_count,
+        'reading_minutes': max(1, round(word_count / WORDS_PER_MINUTE)),
+        'auto_excerpt': make_excerpt(text),
+    }
@@ -11,9 +11,13 @@ from django.conf import settings
 from django.core import signing
 from django.core.files.base import ContentFile
 from django.core.files.storage import default_storage
-from django.http import JsonResponse, FileResponse, Http404, HttpResponse, HttpResponseBadRequest
+from django.http import (
+    JsonResponse, FileResponse, Http404, HttpResponse, HttpResponseBadRequest, HttpResponsePermanentRedirect,
+    StreamingHttpResponse,
+)
 from django.shortcuts import get_object_or_404, render, redirect
 from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from django.views.generic import TemplateView
 from django.views.decorators.http import require_POST, require_GET
 from django.middleware.csrf import get_token
@@ -21,10 +25,12 @@ from django.contrib.admin.views.decorators import staff_member_required
 from django.db import transaction
 from django.urls import reverse
 from rest_framework import permissions, viewsets, status, filters
+from rest_framework.exceptions import APIException
 from rest_framework.decorators import action, api_view, permission_classes, parser_classes
 from rest_framework.permissions import IsAuthenticatedOrReadOnly, AllowAny, IsAdminUser
 from rest_framework.response import Response
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework.utils.urls import replace_query_param
 
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db import models as dj_models
@@ -32,16 +38,33 @@ from django.db import models as dj_models
 from django.views.decorators.csrf import csrf_exempt, ensure_csrf_cookie
 from django.utils.decorators import method_decorator
 
-from .models import Post, Category, PostView, Tag, Comment, PostReaction, PostAttachment, PostRevision
+from .models import Post, Category, PostView, Tag, Comment, PostReaction, PostAttachment, PostRevision, RelatedPost, published_q
 from .serializers import (
-    PostListSerializer, PostDetailSerializer, PostCreateUpdateSerializer,
-    CategorySerializer, TagSerializer, CommentSerializer
+    PostListSerializer, PostDetailSerializer, PostBatchSerializer, PostCreateUpdateSerializer,
+    CategorySerializer, TagSerializer, CategoryCountSerializer, TagCountSerializer, CommentSerializer
 )
+from .pagination import PostKeysetPagination, wants_keyset_pagination
+from .cache import CachedReadMixin, bump_generation
+from .counters import bump_counter
+from .comments import COMMENT_MAX_DEPTH, load_thread_page, reply_too_deep
+from .related import RELATED_POSTS_LIMIT
+from .autocomplete import AUTOCOMPLETE_CACHE_TTL, AUTOCOMPLETE_MIN_LENGTH, normalize_query, suggest
+from .slugs import resolve_post_reference
+from .archive import archive_months, archive_years, month_range
+from .export import export_token_valid, iter_export
+from .previews import PREVIEW_MAX_AGE, is_preview_id, load_preview, store_preview
+from .patching import PatchError, VersionConflict, post_version, resolve_patch, wants_patch
+from .revisions import delete_revisions, record_revision, revision_content, snapshot_post
 
 logger = logging.getLogger(__name__)
 
 PREVIEW_SALT = getattr(settings, "PREVIEW_SALT", "post-preview-salt")
-PREVIEW_MAX_AGE = getattr(settings, "PREVIEW_MAX_AGE", 60 * 60)
+
+# Post columns never read by list serializers, and the actions serialized with PostListSerializer
+LIST_DEFERRED_FIELDS = ('content', 'content_json', 'plain_text', 'content_html', 'toc')
+LIST_ACTIONS = ('list', 'related', 'archive_month')
+# upper bound of ?slugs= in GET /posts/batch/
+POST_BATCH_MAX = getattr(settings, 'BLOG_POST_BATCH_MAX', 50)
 
 
 
@@ -49,12 +72,18 @@ PREVIEW_MAX_AGE = getattr(settings, "PREVIEW_MAX_AGE", 60 * 60)
 # Preview / Post preview token
 # ---------------------------
 def preview_by_token(request, token):
-    try:
-        payload = signing.loads(token, salt=PREVIEW_SALT, max_age=PREVIEW_MAX_AGE)
-    except signing.SignatureExpired:
-        raise Http404("Preview token expired")
-    except signing.BadSignature:
-        raise Http404("Invalid preview token")
+    if is_preview_id(token):
+        payload = load_preview(token)
+        if payload is None:
+            raise Http404("Preview expired")
+    else:
+        # legacy signed tokens carrying the whole payload
+        try:
+            payload = signing.loads(token, salt=PREVIEW_SALT, max_age=PREVIEW_MAX_AGE)
+        except signing.SignatureExpired:
+            raise Http404("Preview token expired")
+        except signing.BadSignature:
+            raise Http404("Invalid preview token")
     post_data = {
         'title': payload.get('title', ''),
         'content': payload.get('content', ''),
@@ -68,7 +97,7 @@ def preview_by_token(request, token):
 # ---------------------------
 # Post / Category / Tag / Comment API (ViewSets)
 # ---------------------------
-class PostViewSet(viewsets.ModelViewSet):
+class PostViewSet(CachedReadMixin, viewsets.ModelViewSet):
     """
     Rest viewset for blog posts.
 
@@ -78,7 +107,15 @@ class PostViewSet(viewsets.ModelViewSet):
     - fallback lookup by PK if slug lookup fails
     - robust create/update/destroy with try/except, logging traceback and returning JSON errors
     - revision snapshot creation before updates
+    - opt-in keyset pagination (?pagination=cursor / ?cursor=...) for infinite scroll feeds
+    - list/retrieve served from the generation-keyed API cache (staff and previews bypass it)
+    - Cache-Control / ETag / Surrogate-Key headers for edge caches (purged by blog/purge.py)
+    - updates accept content/content_json patches with a base_version check (blog/patching.py)
     """
+    cache_namespace = 'posts'
+    surrogate_key_prefix = 'post'
+    # comment threads change more often than posts
+    cache_policies = {'comments': (15, 60)}
     queryset = Post.objects.all()
     permission_classes = [IsAuthenticatedOrReadOnly]
     filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
@@ -88,25 +125,47 @@ class PostViewSet(viewsets.ModelViewSet):
     ordering = ['-published_at']
     lookup_field = 'slug'
 
+    @property
+    def paginator(self):
+        """
+        Default PageNumberPagination unless the client opts into keyset pagination,
+        which avoids COUNT(*) and OFFSET on deep pages. Archive months always use keyset.
+        """
+        if not hasattr(self, '_paginator'):
+            if self.action == 'archive_month' or (self.action == 'list' and wants_keyset_pagination(self.request)):
+                self._paginator = PostKeysetPagination()
+            else:
+                self._paginator = super().paginator
+        return self._paginator
+
     def get_serializer_class(self):
-        if self.action in ('list',):
+        if self.action in LIST_ACTIONS:
             return PostListSerializer
-        if self.action in ('retrieve',):
+        if self.action == 'retrieve':
             return PostDetailSerializer
+        if self.action == 'batch':
+            return PostBatchSerializer
         return PostCreateUpdateSerializer
 
     def get_queryset(self):
         """
         Base queryset with defensive filters:
-        - select_related + prefetch for performance
+        - select_related + prefetch for performance (cover_attachment avoids a per-post attachment query)
         - for anonymous users, only published posts with non-null published_at and published_at <= now()
         """
-        qs = Post.objects.select_related('author').prefetch_related('categories', 'tags')
+        qs = Post.objects.select_related('author', 'cover_attachment')
+        if self.action in LIST_ACTIONS:
+            # list serializers use the precomputed excerpt/metrics and render categories/tags
+            # from the taxonomy snapshot (blog/taxonomy.py); skip the heavy body columns
+            qs = qs.defer(*LIST_DEFERRED_FIELDS)
+        elif self.action != 'batch':
+            # batch renders categories/tags from the taxonomy snapshot like lists do
+            qs = qs.prefetch_related('categories', 'tags')
         user = getattr(self.request, 'user', None)
         if not (user and getattr(user, 'is_staff', False)):
             now = timezone.now()
             try:
-                qs = qs.filter(status='published', published_at__isnull=False, published_at__lte=now)
+                qs = qs.published(now)
             except Exception:
                 # In case of unexpected DB issues, log and fallback to safer filter
                 logger.exception("Error applying published filter on Post queryset; falling back to status-only filter")
@@ -128,38 +187,40 @@ class PostViewSet(viewsets.ModelViewSet):
         """
         Defensive override to:
          - return 404 for obviously-bad slugs (like 'undefined')
-         - try lookup by slug, then fallback to PK if slug lookup fails
+         - resolve current slug, old slug or PK via blog/slugs.py (cached), then fetch by PK
+           from the visibility-filtered queryset in one indexed query
         """
+        from rest_framework.exceptions import NotFound
+
         lookup_val = self.kwargs.get(self.lookup_field)
         logger.debug("PostViewSet.get_object lookup_field=%s value=%s", self.lookup_field, lookup_val)
 
         if self._is_invalid_slug_value(lookup_val):
             logger.warning("Attempt to retrieve post with invalid slug value: %s", lookup_val)
             # Return 404 (DRF style)
-            from rest_framework.exceptions import NotFound
             raise NotFound(detail="Invalid post identifier")
 
-        # First try the normal lookup (slug)
-        try:
-            return super().get_object()
-        except Exception as e_slug:
-            logger.debug("Slug lookup failed for %s: %s — trying fallback by id", lookup_val, e_slug)
-            # Fallback: if lookup_val looks like integer, try pk
-            try:
-                if lookup_val and str(lookup_val).isdigit():
-                    obj = Post.objects.select_related('author').prefetch_related('categories', 'tags').get(pk=int(lookup_val))
-                    # ensure visibility according to get_queryset
-                    qs = self.filter_queryset(self.get_queryset())
-                    if obj not in qs:
-                        # object exists but not visible to requester
-                        from rest_framework.exceptions import NotFound
-                        raise NotFound(detail="Post not found")
-                    return obj
-            except Post.DoesNotExist:
-                pass
-            # re-raise original to produce proper 404
-            from rest_framework.exceptions import NotFound
+        resolved = resolve_post_reference(lookup_val)
+        if resolved is None:
+            raise NotFound(detail="Post not found")
+        obj = self.filter_queryset(self.get_queryset()).filter(pk=resolved[0]).first()
+        if obj is None:
+            # unknown, or exists but not visible to requester
             raise NotFound(detail="Post not found")
+        self.check_object_permissions(self.request, obj)
+        self._surrogate_object = obj
+        return obj
+
+    def retrieve(self, request, *args, **kwargs):
+        """Old slugs answer with a permanent redirect to the post's current URL."""
+        lookup_val = str(kwargs.get(self.lookup_field) or '').strip()
+        resolved = None if self._is_invalid_slug_value(lookup_val) else resolve_post_reference(lookup_val)
+        if resolved and resolved[1] != lookup_val and not lookup_val.isdigit():
+            obj = self.get_object()
+            location = reverse('blog:post-detail', kwargs={self.lookup_field: obj.slug})
+            query = request.META.get('QUERY_STRING')
+            return HttpResponsePermanentRedirect(f"{location}?{query}" if query else location)
+        return super().retrieve(request, *args, **kwargs)
 
     def perform_create(self, serializer):
         """
@@ -187,13 +248,9 @@ class PostViewSet(viewsets.ModelViewSet):
                 instance = self.get_object()
                 # create revision snapshot BEFORE applying update
                 try:
-                    PostRevision.objects.create(
-                        post=instance,
+                    snapshot_post(
+                        instance,
                         author=self.request.user if getattr(self.request, "user", None) and self.request.user.is_authenticated else None,
-                        content=instance.content or "",
-                        title=instance.title or "",
-                        excerpt=instance.excerpt or "",
-                        autosave=False,
                         meta={'reason': 'manual update via API'}
                     )
                 except Exception:
@@ -247,17 +304,32 @@ class PostViewSet(viewsets.ModelViewSet):
         try:
             partial = kwargs.pop('partial', False)
             instance = self.get_object()
-            serializer = self.get_serializer(instance, data=request.data, partial=partial)
-            if not serializer.is_valid():
-                logger.debug("Post update validation failed: %s", serializer.errors)
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
-            try:
-                self.perform_update(serializer)
-            except Exception as e:
-                tb = traceback.format_exc()
-                logger.exception("Error in perform_update: %s", tb)
-                return Response({'detail': 'Failed to update post', 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-            return Response(serializer.data)
+            data = request.data
+            # version check and save in one transaction, the row locked in between
+            with transaction.atomic():
+                if wants_patch(data):
+                    # content_patch / content_json_patch / base_version (blog/patching.py)
+                    instance.refresh_from_db(from_queryset=Post.objects.select_for_update())
+                    try:
+                        data = resolve_patch(instance, data)
+                    except VersionConflict as e:
+                        return Response({'detail': 'Post was changed by someone else', 'version': e.current},
+                                        status=status.HTTP_409_CONFLICT)
+                    except PatchError as e:
+                        return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+                    partial = True
+                serializer = self.get_serializer(instance, data=data, partial=partial)
+                if not serializer.is_valid():
+                    logger.debug("Post update validation failed: %s", serializer.errors)
+                    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+                try:
+                    self.perform_update(serializer)
+                except Exception as e:
+                    tb = traceback.format_exc()
+                    logger.exception("Error in perform_update: %s", tb)
+                    return Response({'detail': 'Failed to update post', 'error': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            # clients send `version` back as base_version with their next patch
+            return Response({**serializer.data, 'version': post_version(serializer.instance)})
         except Exception as e:
             tb = traceback.format_exc()
             logger.exception("PostViewSet.update unexpected error: %s", tb)
@@ -286,12 +358,108 @@ class PostViewSet(viewsets.ModelViewSet):
         """
         try:
             return super().list(request, *args, **kwargs)
+        except APIException:
+            # deliberate DRF errors (e.g. invalid cursor / page) keep their own status
+            raise
         except Exception as e:
             tb = traceback.format_exc()
             logger.exception("PostViewSet.list failed: %s", tb)
             # Return a safe error response with minimal detail (do not leak sensitive internals)
             return Response({'detail': 'Internal server error while listing posts'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+    @action(detail=True, methods=['get'], url_path='comments', permission_classes=[AllowAny])
+    def comments(self, request, slug=None):
+        """
+        GET /api/blog/posts/<slug>/comments/?after=<root comment id>&limit=<n>
+        Paginated public comment threads; each page is two indexed queries regardless of depth.
+        """
+        return self.cached_response(request, self._comments_page, slug=slug)
+
+    def _comments_page(self, request, slug=None):
+        post = self.get_object()
+        try:
+            after = int(request.query_params['after']) if request.query_params.get('after') else None
+            limit = int(request.query_params['limit']) if request.query_params.get('limit') else None
+        except (TypeError, ValueError):
+            return Response({'detail': 'after and limit must be integers'}, status=status.HTTP_400_BAD_REQUEST)
+        roots, has_more = load_thread_page(post.pk, after=after, limit=limit)
+        next_url = None
+        if has_more:
+            next_url = replace_query_param(request.build_absolute_uri(), 'after', roots[-1].pk)
+        return Response({
+            'count': post.comments_count,
+            'next': next_url,
+            'results': CommentSerializer(roots, many=True, context=self.get_serializer_context()).data,
+        })
+
+    @action(detail=True, methods=['get'], url_path='related', permission_classes=[AllowAny])
+    def related(self, request, slug=None):
+        """
+        GET /api/blog/posts/<slug>/related/ — served from the precomputed RelatedPost index.
+        """
+        return self.cached_response(request, self._related_posts, slug=slug)
+
+    def _related_posts(self, request, slug=None):
+        post = self.get_object()
+        related_ids = list(RelatedPost.objects.filter(post=post).order_by('-score')
+                           .values_list('related_id', flat=True)[:RELATED_POSTS_LIMIT])
+        posts = {p.pk: p for p in self.get_queryset().filter(pk__in=related_ids)}
+        ordered = [posts[pk] for pk in related_ids if pk in posts]
+        serializer = self.get_serializer(ordered, many=True)
+        return Response({'results': serializer.data})
+
+    @action(detail=False, methods=['get'], url_path='batch', permission_classes=[AllowAny])
+    def batch(self, request):
+        """
+        GET /api/blog/posts/batch/?slugs=a,b,c — several posts in one query, in request order;
+        slugs that are missing (or not visible) come back as null.
+        """
+        return self.cached_response(request, self._batch)
+
+    def _batch(self, request):
+        slugs = [s.strip() for s in request.query_params.get('slugs', '').split(',') if s.strip()]
+        if not slugs:
+            return Response({'detail': 'Missing slugs'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(slugs) > POST_BATCH_MAX:
+            return Response({'detail': f'At most {POST_BATCH_MAX} slugs per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        qs = self.get_queryset().filter(slug__in=set(slugs)).prefetch_related('attachments')
+        posts = list(qs)
+        # many=True: categories/tags come from the taxonomy snapshot for the whole batch
+        data = {post.slug: item for post, item in zip(posts, self.get_serializer(posts, many=True).data)}
+        return Response({'results': [data.get(slug) for slug in slugs]})
+
+    # archive views are routed in blog/urls.py (outside the /posts/ prefix)
+    def archive(self, request):
+        """
+        GET /api/blog/archive/ — per-month and per-year post counts from the ArchiveMonth histogram.
+        """
+        return self.cached_response(request, self._archive)
+
+    def _archive(self, request):
+        months = archive_months()
+        return Response({'years': archive_years(months), 'months': months})
+
+    def archive_month(self, request, year=None, month=None):
+        """
+        GET /api/blog/archive/<year>/<month>/ — published posts of a month, keyset-paginated
+        over the (status, published_at) index.
+        """
+        return self.cached_response(request, self._archive_month, year=year, month=month)
+
+    def _archive_month(self, request, year=None, month=None):
+        from rest_framework.exceptions import NotFound
+        try:
+            # bad months, and the end of December 9999, are not representable
+            start, end = month_range(year, month)
+        except (ValueError, OverflowError):
+            raise NotFound(detail="Invalid archive month")
+        # public archive even for staff: no drafts or scheduled posts
+        qs = self.get_queryset().published().filter(published_at__gte=start, published_at__lt=end)
+        page = self.paginate_queryset(qs)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
     @action(detail=True, methods=['post'], permission_classes=[AllowAny])
     def add_comment(self, request, slug=None):
         """
@@ -307,19 +475,44 @@ class PostViewSet(viewsets.ModelViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
-class CategoryViewSet(viewsets.ModelViewSet):
+def published_post_count():
+    """Count of visible posts per category/tag, for annotate() on either model."""
+    return dj_models.Count('posts', filter=published_q(prefix='posts__'), distinct=True)
+
+
+class CategoryViewSet(CachedReadMixin, viewsets.ModelViewSet):
+    cache_namespace = 'categories'
+    surrogate_key_prefix = 'category'
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
 
+    def get_queryset(self):
+        return Category.objects.annotate(post_count=published_post_count()).order_by('title')
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve'):
+            return CategoryCountSerializer
+        return CategorySerializer
+
 
-class TagViewSet(viewsets.ModelViewSet):
+class TagViewSet(CachedReadMixin, viewsets.ModelViewSet):
+    cache_namespace = 'tags'
+    surrogate_key_prefix = 'tag'
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
     lookup_field = 'slug'
 
+    def get_queryset(self):
+        return Tag.objects.annotate(post_count=published_post_count()).order_by('title')
+
+    def get_serializer_class(self):
+        if self.action in ('list', 'retrieve'):
+            return TagCountSerializer
+        return TagSerializer
+
 
 class CommentViewSet(viewsets.ModelViewSet):
     """
@@ -344,9 +537,57 @@ class CommentViewSet(viewsets.ModelViewSet):
         If you prefer CSRF protection, remove the decorator and ensure frontend
         fetches /api/blog/csrf/ before POST and sends X-CSRFToken header.
         """
+        if reply_too_deep(request.data.get('parent')):
+            return Response({'detail': f'Replies are limited to {COMMENT_MAX_DEPTH} levels of nesting'},
+                            status=status.HTTP_400_BAD_REQUEST)
         return super().create(request, *args, **kwargs)
 
 
+# ---------------------------
+# NDJSON export for static builds
+# ---------------------------
+@require_GET
+def export_posts(request):
+    """
+    GET /api/blog/export/posts.ndjson[?updated_since=<iso datetime>] — token-protected stream
+    of all public posts (see blog/export.py).
+    """
+    if not export_token_valid(request):
+        return JsonResponse({'detail': 'Invalid export token'}, status=403)
+    updated_since = None
+    raw = request.GET.get('updated_since')
+    if raw:
+        try:
+            updated_since = parse_datetime(raw)
+        except ValueError:
+            # well-formed but invalid, e.g. 2026-13-45T00:00:00
+            updated_since = None
+        if updated_since is None:
+            return HttpResponseBadRequest("updated_since must be an ISO 8601 datetime")
+        if timezone.is_naive(updated_since):
+            updated_since = timezone.make_aware(updated_since)
+    response = StreamingHttpResponse(iter_export(updated_since, request=request),
+                                     content_type='application/x-ndjson; charset=utf-8')
+    response['Cache-Control'] = 'private, no-store'
+    return response
+
+
+# ---------------------------
+# Search-as-you-type
+# ---------------------------
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def autocomplete(request):
+    query = normalize_query(request.query_params.get('q'))
+    if len(query) < AUTOCOMPLETE_MIN_LENGTH:
+        result = {'posts': [], 'tags': []}
+    else:
+        result = suggest(query)
+    response = Response({'query': query, **result})
+    response['Cache-Control'] = f'public, max-age={AUTOCOMPLETE_CACHE_TTL}'
+    return response
+
+
 # ---------------------------
 # Reactions endpoints
 # ---------------------------
@@ -356,9 +597,9 @@ def reaction_detail(request):
     post_slug = request.query_params.get('post_slug')
     if not post_slug:
         return Response({'detail': 'Missing post_slug'}, status=status.HTTP_400_BAD_REQUEST)
-    post = get_object_or_404(Post, slug=post_slug)
-    reaction, _ = PostReaction.objects.get_or_create(post=post)
-    return Response({'post_slug': post.slug, 'likes_count': reaction.likes_count()})
+    post = get_object_or_404(Post.objects.only('id', 'slug', 'likes_count'), slug=post_slug)
+    # denormalized counter (blog/counters.py) — no reaction/users count queries
+    return Response({'post_slug': post.slug, 'likes_count': post.likes_count})
 
 
 @api_view(['POST'])
@@ -377,11 +618,15 @@ def reaction_toggle(request):
                 reaction.users.remove(user)
             else:
                 reaction.users.add(user)
+            reaction.save(update_fields=['updated_at'])
         else:
-            # If anonymous, we toggle via anon_count but be conservative: increment only
-            reaction.anon_count = reaction.anon_count + 1 if reaction.anon_count >= 0 else 1
-        reaction.save()
-    return Response({'post_slug': post.slug, 'likes_count': reaction.likes_count()})
+            # If anonymous, we toggle via anon_count but be conservative: increment only.
+            # F() keeps concurrent anonymous likes from overwriting each other.
+            PostReaction.objects.filter(pk=reaction.pk).update(anon_count=dj_models.F('anon_count') + 1, updated_at=timezone.now())
+            bump_counter(post.pk, 'likes_count', 1)
+            transaction.on_commit(bump_generation)
+        likes_count = Post.objects.filter(pk=post.pk).values_list('likes_count', flat=True).first() or 0
+    return Response({'post_slug': post.slug, 'likes_count': likes_count})
 
 
 # ---------------------------
@@ -514,7 +759,8 @@ def admin_stats_api(request):
 def admin_post_update_view(request):
     """
     Legacy admin update endpoint (kept for compatibility with admin UI JS).
-    Accepts JSON or form-data. Validates fields and updates the Post.
+    Accepts JSON or form-data. Validates fields and updates the Post; content may come
+    as a patch against base_version (blog/patching.py), and only changed columns are written.
     """
     try:
         if request.content_type and 'application/json' in request.content_type:
@@ -524,40 +770,54 @@ def admin_post_update_view(request):
         post_id = data.get('post_id')
         if not post_id:
             return JsonResponse({'success': False, 'message': 'post_id required'}, status=400)
-        try:
-            post = Post.objects.get(pk=int(post_id))
-        except Post.DoesNotExist:
-            return JsonResponse({'success': False, 'message': 'Post not found'}, status=404)
-
-        allowed = {'title', 'excerpt', 'content', 'status', 'meta_description', 'meta_title', 'featured_image'}
-        updates = {}
-        # ensure data is dict-like
-        iterable = data.items() if hasattr(data, 'items') else []
-        for k, v in iterable:
-            if k in allowed:
-                updates[k] = v
-
-        if not updates:
-            return JsonResponse({'success': False, 'message': 'No updatable fields provided'}, status=400)
+        # version check and save in one transaction, the row locked in between
+        with transaction.atomic():
+            try:
+                post = Post.objects.select_for_update().get(pk=int(post_id))
+            except Post.DoesNotExist:
+                return JsonResponse({'success': False, 'message': 'Post not found'}, status=404)
 
-        # Save snapshot before update
-        try:
-            PostRevision.objects.create(
-                post=post,
-                author=request.user if request.user.is_authenticated else None,
-                content=post.content or "",
-                title=post.title or "",
-                excerpt=post.excerpt or "",
-                autosave=False,
-                meta={'reason': 'admin quick update'}
-            )
-        except Exception:
-            logger.exception("Could not create revision before admin quick update for post id=%s", getattr(post, "id", None))
+            if wants_patch(data):
+                # content_patch / content_json_patch / base_version (blog/patching.py)
+                try:
+                    data = resolve_patch(post, data)
+                except VersionConflict as e:
+                    return JsonResponse({'success': False, 'message': 'Post was changed by someone else',
+                                         'version': e.current}, status=409)
+                except PatchError as e:
+                    return JsonResponse({'success': False, 'message': str(e)}, status=400)
+
+            allowed = {'title', 'excerpt', 'content', 'content_json', 'status', 'meta_description', 'meta_title', 'featured_image'}
+            updates = {}
+            # ensure data is dict-like
+            iterable = data.items() if hasattr(data, 'items') else []
+            for k, v in iterable:
+                if k in allowed:
+                    updates[k] = v
+
+            if not updates:
+                return JsonResponse({'success': False, 'message': 'No updatable fields provided'}, status=400)
+
+            # skip the write (and the revision) when nothing actually changed
+            updates = {k: v for k, v in updates.items() if getattr(post, k) != v}
+            if not updates:
+                return JsonResponse({'success': True, 'post_id': post.id, 'version': post_version(post), 'changed': []})
+
+            # Save snapshot before update
+            try:
+                snapshot_post(
+                    post,
+                    author=request.user if request.user.is_authenticated else None,
+                    meta={'reason': 'admin quick update'}
+                )
+            except Exception:
+                logger.exception("Could not create revision before admin quick update for post id=%s", getattr(post, "id", None))
 
-        for k, v in updates.items():
-            setattr(post, k, v)
-        post.save()
-        return JsonResponse({'success': True, 'post_id': post.id})
+            for k, v in updates.items():
+                setattr(post, k, v)
+            post.save(update_fields=list(updates) + ['updated_at'])
+            return JsonResponse({'success': True, 'post_id': post.id, 'version': post_version(post),
+                                 'changed': sorted(updates)})
     except Post.DoesNotExist:
         return JsonResponse({'success': False, 'message': 'Post not found'}, status=404)
     except Exception:
@@ -579,7 +839,7 @@ def admin_autosave_view(request):
             'excerpt': data.get('excerpt', ''),
             'featured_image': data.get('featured_image', ''),
         }
-        token = signing.dumps(payload, salt=PREVIEW_SALT)
+        token = store_preview(payload)
         return JsonResponse({'success': True, 'preview_token': token, 'preview_url': reverse('post-preview', args=[token])})
     except Exception:
         logger.exception("admin_autosave_view error")
@@ -799,11 +1059,13 @@ def revisions_list(request, post_id):
     Returns revisions for post_id (admin-only).
     """
     try:
-        revisions = PostRevision.objects.filter(post_id=post_id).order_by('-created_at')[:100]
+        revisions = (PostRevision.objects.filter(post_id=post_id).select_related('author')
+                     .defer('data', 'excerpt', 'meta').order_by('-created_at')[:100])
         data = [{
             'id': r.id,
             'author': getattr(r.author, 'username', None),
             'created_at': r.created_at.isoformat(),
+            'updated_at': r.updated_at.isoformat(),
             'autosave': r.autosave,
             'title': r.title,
         } for r in revisions]
@@ -820,17 +1082,10 @@ def revision_restore(request, revision_id):
         r = PostRevision.objects.get(pk=revision_id)
         post = r.post
         # Save current as manual revision before restore
-        PostRevision.objects.create(
-            post=post,
-            author=request.user if request.user.is_authenticated else None,
-            content=post.content,
-            title=post.title,
-            excerpt=post.excerpt,
-            autosave=False,
-            meta={'restored_from': r.id}
-        )
-        # restore
-        post.content = r.content
+        snapshot_post(post, author=request.user if request.user.is_authenticated else None,
+                      meta={'restored_from': r.id})
+        # restore: content is rebuilt from the revision's keyframe and deltas
+        post.content = revision_content(r)
         post.title = r.title
         post.excerpt = r.excerpt
         post.save(update_fields=['content', 'title', 'excerpt'])
@@ -866,19 +1121,19 @@ def autosave_revision(request):
         else:
             post = None
 
-        rev = PostRevision.objects.create(
-            post=post,
-            author=request.user if request.user.is_authenticated else None,
-            content=content,
-            title=title,
-            excerpt=excerpt,
-            autosave=autosave,
-            meta={'client': 'admin-autosave'}
-        )
-        # create preview token (signed payload) for preview_by_token
+        rev = None
+        if post is not None:
+            # coalesced with the previous autosave within BLOG_REVISION_COALESCE_WINDOW (blog/revisions.py)
+            rev = record_revision(
+                post, title, content, excerpt,
+                author=request.user if request.user.is_authenticated else None,
+                autosave=autosave,
+                meta={'client': 'admin-autosave'}
+            )
+        # short preview id for preview_by_token (blog/previews.py)
         payload = {'title': title, 'content': content, 'excerpt': excerpt}
-        token = signing.dumps(payload, salt=PREVIEW_SALT)
-        return Response({'success': True, 'revision_id': rev.id, 'preview_token': token, 'preview_url': reverse('post-preview', args=[token])})
+        token = store_preview(payload)
+        return Response({'success': True, 'revision_id': rev.id if rev else None, 'preview_token': token, 'preview_url': reverse('post-preview', args=[token])})
     except Exception:
         logger.exception("autosave_revision error")
         return Response({'success': False, 'message': 'internal'}, status=500)
@@ -891,7 +1146,8 @@ def revisions_delete(request):
         ids = request.data.get('ids') or []
         if not isinstance(ids, (list, tuple)):
             return Response({'success': False, 'message': 'ids must be list'}, status=400)
-        deleted = PostRevision.objects.filter(id__in=ids).delete()[0]
+        # later revisions of the same posts are re-encoded so their deltas keep a base
+        deleted = delete_revisions(PostRevision.objects.filter(id__in=ids))
         return Response({'success': True, 'deleted': deleted})
     except Exception:
         logger.exception("revisions_delete error")
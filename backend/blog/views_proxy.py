@@ -1,25 +1,226 @@
 # backend/blog/views_proxy.py
+"""
+Caching proxy for the WordPress posts feed.
+
+Responses are cached per (page, perPage):
+
+- fresh for WP_PROXY_FRESH seconds: served from the cache;
+- then stale (kept up to WP_PROXY_STALE seconds): served immediately while a
+  single background refresh (guarded by cache.add) revalidates it upstream
+  with If-None-Match / If-Modified-Since;
+- a circuit breaker opens after WP_BREAKER_THRESHOLD consecutive upstream
+  failures; while it is open (WP_BREAKER_COOLDOWN seconds) upstream is not
+  called at all and the last good response is served;
+- the last good response is also kept in a separate entry without expiry, so
+  a miss while WordPress is down (for longer than WP_PROXY_STALE) still gets
+  it instead of an error.
+"""
+import logging
+import threading
+import time
 
 import requests
+from django.conf import settings
+from django.core.cache import cache
 from django.http import JsonResponse
 from django.views.decorators.http import require_GET
 
-@require_GET
-def wordpress_posts_proxy(request):
-    page = request.GET.get('page', '1')
-    per_page = request.GET.get('perPage', '10')
-    wp_url = f"https://cs88500-wordpress-o0a99.tw1.ru/wp-json/wp/v2/posts?per_page={per_page}&page={page}&_embed"
+logger = logging.getLogger(__name__)
+
+WP_POSTS_URL = getattr(settings, 'BLOG_WP_POSTS_URL', "https://cs88500-wordpress-o0a99.tw1.ru/wp-json/wp/v2/posts")
+WP_PROXY_TIMEOUT = getattr(settings, 'BLOG_WP_PROXY_TIMEOUT', 10)
+WP_PROXY_FRESH = getattr(settings, 'BLOG_WP_PROXY_FRESH', 60)
+WP_PROXY_STALE = getattr(settings, 'BLOG_WP_PROXY_STALE', 60 * 60 * 24)
+WP_BREAKER_THRESHOLD = getattr(settings, 'BLOG_WP_BREAKER_THRESHOLD', 5)
+WP_BREAKER_COOLDOWN = getattr(settings, 'BLOG_WP_BREAKER_COOLDOWN', 60)
+WP_MAX_PAGE = 10000
+WP_MAX_PER_PAGE = 100
+# upstream headers worth passing through (pagination totals)
+WP_PASS_HEADERS = ('X-WP-Total', 'X-WP-TotalPages')
+
+BREAKER_KEY = 'blog:wp:breaker'
+_session = requests.Session()
+
+
+class UpstreamError(Exception):
+    pass
+
+
+def _entry_key(page, per_page):
+    return f"blog:wp:posts:{page}:{per_page}"
+
+
+def _last_good_key(key):
+    return f"{key}:last-good"
+
+
+# ---------------------------
+# Circuit breaker
+# ---------------------------
+def breaker_open():
+    try:
+        state = cache.get(BREAKER_KEY) or {}
+    except Exception:
+        logger.exception("wp proxy: breaker state unreadable")
+        return False
+    return state.get('open_until', 0) > time.time()
+
+
+def _record_failure():
+    try:
+        state = cache.get(BREAKER_KEY) or {}
+        failures = state.get('failures', 0) + 1
+        state = {'failures': failures, 'open_until': state.get('open_until', 0)}
+        if failures >= WP_BREAKER_THRESHOLD:
+            state['open_until'] = time.time() + WP_BREAKER_COOLDOWN
+            logger.warning("wp proxy: circuit open for %ss after %s failures", WP_BREAKER_COOLDOWN, failures)
+        cache.set(BREAKER_KEY, state, None)
+    except Exception:
+        logger.exception("wp proxy: could not record failure")
+
+
+def _record_success():
+    try:
+        cache.delete(BREAKER_KEY)
+    except Exception:
+        logger.exception("wp proxy: could not reset breaker")
+
+
+# ---------------------------
+# Upstream
+# ---------------------------
+def fetch(page, per_page, entry=None):
+    """
+    Fetch one page upstream, conditionally if entry is given. Returns the new cache
+    entry, or (status, body) for a client error upstream (e.g. page out of range).
+    Raises UpstreamError on transport errors and 5xx.
+    """
+    headers = {}
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+    params = {'per_page': per_page, 'page': page, '_embed': ''}
     try:
-        resp = requests.get(wp_url, timeout=10)
+        resp = _session.get(WP_POSTS_URL, params=params, headers=headers, timeout=WP_PROXY_TIMEOUT)
     except requests.RequestException as e:
-        return JsonResponse({'error': 'Failed to fetch from WP', 'details': str(e)}, status=502)
+        raise UpstreamError(str(e))
 
+    if resp.status_code == 304 and entry:
+        return {**entry, 'fetched_at': time.time()}
+    if resp.status_code >= 500:
+        raise UpstreamError(f"WP status {resp.status_code}")
     if resp.status_code != 200:
-        return JsonResponse({'error': 'WP status not 200', 'status': resp.status_code}, status=resp.status_code)
-
+        return resp.status_code, {'error': 'WP status not 200', 'status': resp.status_code}
     try:
         data = resp.json()
     except ValueError:
-        return JsonResponse({'error': 'Invalid JSON', 'body': resp.text[:200]}, status=502)
+        raise UpstreamError(f"Invalid JSON: {resp.text[:200]}")
+    return {
+        'data': data,
+        'etag': resp.headers.get('ETag', ''),
+        'last_modified': resp.headers.get('Last-Modified', ''),
+        'headers': {h: resp.headers[h] for h in WP_PASS_HEADERS if h in resp.headers},
+        'fetched_at': time.time(),
+    }
 
-    return JsonResponse(data, safe=False)
\ No newline at end of file
+
+def _store(key, entry):
+    try:
+        cache.set(key, entry, WP_PROXY_STALE)
+        cache.set(_last_good_key(key), entry, None)
+    except Exception:
+        logger.exception("wp proxy: cache set failed for %s", key)
+
+
+def _last_good(key):
+    try:
+        return cache.get(_last_good_key(key))
+    except Exception:
+        logger.exception("wp proxy: cache get failed for the last good %s", key)
+        return None
+
+
+def _refresh(key, page, per_page, entry):
+    try:
+        result = fetch(page, per_page, entry)
+        if isinstance(result, dict):
+            _store(key, result)
+        _record_success()
+    except UpstreamError as e:
+        logger.warning("wp proxy: background refresh of %s failed: %s", key, e)
+        _record_failure()
+    except Exception:
+        logger.exception("wp proxy: background refresh of %s failed", key)
+    finally:
+        cache.delete(f"{key}:lock")
+
+
+def _refresh_in_background(key, page, per_page, entry):
+    # one refresh per entry at a time, across processes
+    if not cache.add(f"{key}:lock", 1, WP_PROXY_TIMEOUT * 2):
+        return
+    threading.Thread(target=_refresh, args=(key, page, per_page, entry), daemon=True).start()
+
+
+# ---------------------------
+# View
+# ---------------------------
+def _response(entry, state):
+    response = JsonResponse(entry['data'], safe=False)
+    for header, value in entry.get('headers', {}).items():
+        response[header] = value
+    response['X-Cache'] = state
+    response['Cache-Control'] = f'public, max-age={WP_PROXY_FRESH}'
+    return response
+
+
+def _int_param(request, name, default, upper):
+    """The integer query param (default if missing or not a number); None if outside 1..upper."""
+    try:
+        value = int(request.GET.get(name, default))
+    except (TypeError, ValueError):
+        return default
+    return value if 1 <= value <= upper else None
+
+
+@require_GET
+def wordpress_posts_proxy(request):
+    page = _int_param(request, 'page', 1, WP_MAX_PAGE)
+    per_page = _int_param(request, 'perPage', 10, WP_MAX_PER_PAGE)
+    if page is None or per_page is None:
+        return JsonResponse({'error': f'page must be 1..{WP_MAX_PAGE}, perPage 1..{WP_MAX_PER_PAGE}'}, status=400)
+    key = _entry_key(page, per_page)
+    try:
+        entry = cache.get(key)
+    except Exception:
+        logger.exception("wp proxy: cache get failed for %s", key)
+        entry = None
+
+    if entry is not None:
+        if time.time() - entry['fetched_at'] < WP_PROXY_FRESH:
+            return _response(entry, 'HIT')
+        if not breaker_open():
+            _refresh_in_background(key, page, per_page, entry)
+        return _response(entry, 'STALE')
+
+    if breaker_open():
+        last_good = _last_good(key)
+        if last_good is not None:
+            return _response(last_good, 'STALE')
+        return JsonResponse({'error': 'WP temporarily unavailable'}, status=503)
+    try:
+        result = fetch(page, per_page)
+    except UpstreamError as e:
+        _record_failure()
+        last_good = _last_good(key)
+        if last_good is not None:
+            return _response(last_good, 'STALE')
+        return JsonResponse({'error': 'Failed to fetch from WP', 'details': str(e)}, status=502)
+    _record_success()
+    if not isinstance(result, dict):
+        status_code, body = result
+        return JsonResponse(body, status=status_code)
+    _store(key, result)
+    return _response(result, 'MISS')
@@ -200,6 +200,7 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     "django_extensions",
 
     # Third-party
@@ -266,6 +267,9 @@ CACHES = {
     }
 }
 
+# Кэш ответов публичного API блога (сек); инвалидируется сигналами blog/signals.py
+BLOG_API_CACHE_TIMEOUT = int(os.getenv("BLOG_API_CACHE_TIMEOUT", 300))
+
 AUTH_PASSWORD_VALIDATORS = [
     {"NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator"},
     {"NAME": "django.contrib.auth.password_validation.MinimumLengthValidator"},